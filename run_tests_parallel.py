@@ -0,0 +1,156 @@
+"""Параллельный запуск тестов ya_news и ya_note.
+
+Запуск из корня репозитория: python run_tests_parallel.py [--workers N]
+
+Как и run_tests.sh, сначала проверяет код flake8 и структуру тестов
+скриптом structure_test.py, а затем запускает оба набора тестов
+одновременно. Каждый набор делится на шарды — отдельные процессы pytest,
+между которыми тесты распределяются по отсортированным nodeid. Тестовая
+база SQLite у Django живёт в памяти процесса, поэтому у каждого шарда
+своя база. Итог собирается из отчётов JUnit XML всех шардов.
+
+Код выхода — код первой упавшей проверки, для тестов — самый тяжёлый код
+pytest среди шардов (шард без тестов, код 5, не считается ошибкой, если
+тесты нашлись в других шардах).
+
+Этот же модуль подключается к pytest плагином (-p run_tests_parallel)
+и добавляет опцию --shard INDEX/COUNT.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+BASE_DIR = Path(__file__).resolve().parent
+PROJECTS = ('ya_news', 'ya_note')
+NO_TESTS_COLLECTED = pytest.ExitCode.NO_TESTS_COLLECTED
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        '--shard', metavar='INDEX/COUNT',
+        help='Запустить только шард INDEX из COUNT (нумерация с нуля).'
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config, items):
+    """Оставляет тесты своего шарда, не меняя их порядок."""
+    shard = config.getoption('shard')
+    if not shard:
+        return
+    index, count = map(int, shard.split('/'))
+    mine = set(sorted(item.nodeid for item in items)[index::count])
+    selected = [item for item in items if item.nodeid in mine]
+    config.hook.pytest_deselected(
+        items=[item for item in items if item.nodeid not in mine]
+    )
+    items[:] = selected
+
+
+def run_shard(project, index, count, directory):
+    """Запускает шард и возвращает код выхода, вывод и путь к отчёту."""
+    report = Path(directory) / f'{project}-{index}.xml'
+    env = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(
+            filter(None, (str(BASE_DIR), os.environ.get('PYTHONPATH')))
+        ),
+    }
+    # DJANGO_SETTINGS_MODULE каждого проекта задаёт его pytest.ini.
+    env.pop('DJANGO_SETTINGS_MODULE', None)
+    result = subprocess.run(
+        [sys.executable, '-m', 'pytest', '-p', 'run_tests_parallel',
+         f'--shard={index}/{count}', '--tb=line', f'--junitxml={report}'],
+        cwd=BASE_DIR / project, env=env, capture_output=True, text=True,
+    )
+    return result.returncode, result.stdout + result.stderr, report
+
+
+def totals(reports):
+    """Суммирует счётчики из отчётов JUnit XML."""
+    summary = dict.fromkeys(('tests', 'failures', 'errors', 'skipped'), 0)
+    for report in reports:
+        if not report.exists():
+            continue
+        for suite in ElementTree.parse(report).getroot().iter('testsuite'):
+            for key in summary:
+                summary[key] += int(suite.get(key, 0))
+    return summary
+
+
+def merged_exit_code(codes):
+    codes = [code for code in codes if code != NO_TESTS_COLLECTED]
+    return max(codes) if codes else NO_TESTS_COLLECTED
+
+
+def run_suites(workers):
+    """Запускает шарды обоих проектов и печатает сводный отчёт."""
+    # Ядра делятся между проектами поровну, но не меньше шарда на проект.
+    count = max(1, workers // len(PROJECTS))
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory() as directory, ThreadPoolExecutor(
+        max_workers=count * len(PROJECTS)
+    ) as executor:
+        futures = {
+            (project, index): executor.submit(
+                run_shard, project, index, count, directory
+            )
+            for project in PROJECTS
+            for index in range(count)
+        }
+        results = {key: future.result() for key, future in futures.items()}
+        status = 0
+        for project in PROJECTS:
+            shards = [results[project, index] for index in range(count)]
+            code = merged_exit_code([code for code, _, _ in shards])
+            for shard_code, output, _ in shards:
+                if shard_code not in (0, NO_TESTS_COLLECTED):
+                    print(output, file=sys.stderr)
+            summary = totals([report for _, _, report in shards])
+            print(
+                f'{project}: тестов {summary["tests"]}, '
+                f'упало {summary["failures"]}, '
+                f'ошибок {summary["errors"]}, '
+                f'пропущено {summary["skipped"]}, код {code}'
+            )
+            if code and not status:
+                status = code
+    print(
+        f'Шардов: {count} на проект, '
+        f'время {time.perf_counter() - started:.1f} с'
+    )
+    return status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    for command, message in (
+        (['-m', 'flake8', '--config=setup.cfg'],
+         'flake8 обнаружил отклонения от стандартов, приведите код '
+         'в соответствие с PEP8'),
+        (['structure_test.py'],
+         'Убедитесь, что написанные вами тесты скопированы в указанные '
+         'в ТЗ директории'),
+    ):
+        status = subprocess.run([sys.executable, *command], cwd=BASE_DIR)
+        if status.returncode:
+            print(message, file=sys.stderr)
+            return status.returncode
+    status = run_suites(args.workers)
+    if status:
+        print('При запуске упали тесты, подробности выше.', file=sys.stderr)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Задержка и пропускная способность синхронных и асинхронных страниц.
+
+Запуск: python -m benchmarks.asgi_load [--concurrency 100 1000] [--requests N]
+
+Запросы подаются прямо в ASGI-приложение yanews.asgi без HTTP-сервера:
+замер показывает цену обработки в Django — синхронные представления
+уходят в пул потоков, асинхронные выполняются в цикле событий. Каждое
+из --concurrency соединений шлёт запросы друг за другом, пока не будет
+отправлено --requests запросов. Печатаются p50/p99 задержки и запросы
+в секунду.
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from benchmarks import test_database
+from news.models import Comment, News
+from yanews.asgi import application
+from yanews.metrics import percentile
+
+NEWS_COUNT = 50
+COMMENTS_PER_NEWS = 30
+PATHS = (
+    ('home', 'news:home', 'news:home_async'),
+    ('detail', 'news:detail', 'news:detail_async'),
+)
+
+
+def fill_database():
+    author = get_user_model().objects.create(username='Автор')
+    news = News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости')
+        for index in range(NEWS_COUNT)
+    )
+    Comment.objects.bulk_create(
+        Comment(news=item, author=author, text='Комментарий')
+        for item in news for _ in range(COMMENTS_PER_NEWS)
+    )
+    News.recount_comments()
+    return news[0].pk
+
+
+async def get(path):
+    """Один GET-запрос к приложению; возвращает время и статус."""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    body_sent = False
+    never = asyncio.get_running_loop().create_future()
+
+    async def receive():
+        nonlocal body_sent
+        if body_sent:
+            # Клиент не отключается: Django ждёт этого до конца ответа.
+            return await never
+        body_sent = True
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    status = None
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    return time.perf_counter() - started, status
+
+
+async def load(path, concurrency, total):
+    """Гоняет total запросов через concurrency соединений."""
+    latencies, failures = [], 0
+    remaining = total
+
+    async def connection():
+        nonlocal remaining, failures
+        while remaining > 0:
+            remaining -= 1
+            elapsed, status = await get(path)
+            latencies.append(elapsed)
+            failures += status != 200
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'rps': total / wall,
+        'failures': failures,
+    }
+
+
+async def run(args, news_pk):
+    for label, sync_name, async_name in PATHS:
+        for concurrency in args.concurrency:
+            for kind, name in (('sync', sync_name), ('async', async_name)):
+                pk_args = (news_pk,) if label == 'detail' else ()
+                path = reverse(name, args=pk_args)
+                # Прогрев кеша карточек и шаблонов.
+                await load(path, 1, 10)
+                result = await load(path, concurrency, args.requests)
+                print(
+                    f'{label:<7}{kind:<6}{concurrency:>6} соединений: '
+                    f'p50 {result["p50_ms"]:8.1f} мс, '
+                    f'p99 {result["p99_ms"]:8.1f} мс, '
+                    f'{result["rps"]:7.0f} запросов/с, '
+                    f'ошибок {result["failures"]}'
+                )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, nargs='+',
+                        default=(100, 1000))
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+    # При DEBUG каждое соединение копит текст запросов.
+    settings.DEBUG = False
+    # Под такой нагрузкой бюджеты превышаются почти у каждого запроса.
+    logging.getLogger('yanews.metrics').setLevel(logging.ERROR)
+    with test_database():
+        news_pk = fill_database()
+        asyncio.run(run(args, news_pk))
+
+
+if __name__ == '__main__':
+    main()
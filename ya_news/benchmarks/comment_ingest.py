@@ -0,0 +1,110 @@
+"""Комментарии в секунду под конкурентной нагрузкой: с очередью и без.
+
+Запуск: python -m benchmarks.comment_ingest [--threads 16] [--duration 5]
+
+Для каждого режима YANEWS_COMMENT_INGEST (sync и queue) запускается
+отдельный процесс. Потоки от имени разных пользователей без пауз
+отправляют форму комментария к одной новости. Печатаются принятые
+(ответ-редирект) и записанные в базу комментарии в секунду с учётом
+дописывания очереди, а также число ошибок.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, close_old_connections
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks import test_database
+from news.ingest import comment_queue
+from news.models import Comment, News
+
+MODES = ('sync', 'queue')
+
+
+def post_comments(user, url, deadline, results):
+    # testserver не входит в ALLOWED_HOSTS проекта.
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(user)
+    accepted = errors = 0
+    while time.monotonic() < deadline:
+        try:
+            response = client.post(url, data={'text': 'Комментарий'})
+            if response.status_code == 302:
+                accepted += 1
+            else:
+                errors += 1
+        except DatabaseError:
+            errors += 1
+    close_old_connections()
+    results.append((accepted, errors))
+
+
+def child(threads, duration):
+    """Замер в дочернем процессе с режимом из окружения."""
+    with test_database():
+        users = get_user_model().objects.bulk_create(
+            get_user_model()(username=f'Читатель {index}')
+            for index in range(threads)
+        )
+        news = News.objects.create(title='Новость', text='Текст')
+        url = reverse('news:detail', args=(news.pk,))
+        results = []
+        started = time.monotonic()
+        workers = [
+            threading.Thread(
+                target=post_comments,
+                args=(user, url, started + duration, results),
+            )
+            for user in users
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        comment_queue.stop()
+        elapsed = time.monotonic() - started
+        written = Comment.objects.count()
+    print(json.dumps({
+        'accepted': sum(accepted for accepted, _ in results) / duration,
+        'written': written / elapsed,
+        'errors': sum(errors for _, errors in results),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        settings.DEBUG = False
+        logging.getLogger('yanews.metrics').setLevel(logging.ERROR)
+        child(args.threads, args.duration)
+        return
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.comment_ingest', '--child',
+             '--threads', str(args.threads),
+             '--duration', str(args.duration)],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'YANEWS_COMMENT_INGEST': mode},
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{mode:<6} принято {result["accepted"]:7.0f}/с, '
+              f'записано {result["written"]:7.0f}/с, '
+              f'ошибок {result["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Память и скорость загрузки фикстур: loaddata против load_news.
+
+Запуск: python -m benchmarks.fixture_loading [--sizes 1000 100000] [--gzip]
+
+Для каждого размера генерируется фикстура с новостями и комментариями
+(около 1 КБ на объект; 1 ГБ — это --sizes 1000000), затем каждая команда
+загружает её в отдельном процессе во временную базу. Печатается пиковый
+RSS процесса и число объектов в секунду.
+"""
+import argparse
+import gzip
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from benchmarks import test_database
+
+COMMANDS = ('loaddata', 'load_news')
+COMMENTS_PER_NEWS = 4
+TEXT = 'Съешь же ещё этих мягких французских булок, да выпей чаю. ' * 16
+
+
+def write_fixture(path, size, compress):
+    """Записывает фикстуру потоково, не собирая её в памяти."""
+    opener = gzip.open if compress else open
+    with opener(path, 'wt', encoding='utf-8') as file:
+        file.write('[\n')
+        for index in range(size):
+            if index % (COMMENTS_PER_NEWS + 1) == 0:
+                news_pk = index // (COMMENTS_PER_NEWS + 1) + 1
+                item = {'model': 'news.news', 'pk': news_pk, 'fields': {
+                    'title': f'Новость {news_pk}', 'text': TEXT,
+                    'date': '2022-11-01',
+                }}
+            else:
+                item = {'model': 'news.comment', 'fields': {
+                    'news': news_pk, 'author': 1, 'text': TEXT,
+                    'created': '2022-11-02T10:00:00Z',
+                }}
+            separator = ',\n' if index < size - 1 else '\n'
+            file.write(json.dumps(item, ensure_ascii=False) + separator)
+        file.write(']\n')
+
+
+def child(command, path):
+    """Загрузка в дочернем процессе: печатает время и пиковый RSS."""
+    # При DEBUG соединение копит текст всех запросов, и пачки bulk_create
+    # в нём занимали бы больше памяти, чем сама загрузка.
+    settings.DEBUG = False
+    with test_database():
+        get_user_model().objects.create(pk=1, username='Автор')
+        started = time.perf_counter()
+        call_command(command, path, verbosity=0)
+        elapsed = time.perf_counter() - started
+    # На Linux ru_maxrss в килобайтах.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({'elapsed': elapsed, 'peak_kb': peak}))
+
+
+def measure(command, path):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.fixture_loading',
+         '--child', command, path],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+',
+                        default=(1_000, 10_000, 100_000))
+    parser.add_argument('--gzip', action='store_true')
+    parser.add_argument('--child', nargs=2, metavar=('COMMAND', 'PATH'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(
+                directory, 'news.json.gz' if args.gzip else 'news.json'
+            )
+            write_fixture(path, size, args.gzip)
+            megabytes = os.path.getsize(path) / 2 ** 20
+            print(f'{size} объектов, файл {megabytes:.1f} МБ')
+            for command in COMMANDS:
+                result = measure(command, path)
+                print(
+                    f'  {command:<10} {result["peak_kb"] / 1024:8.1f} МБ '
+                    f'{size / result["elapsed"]:10.0f} объектов/с'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Горячие пути YaNews: лента, новость и запись комментариев.
+
+Запуск: python -m benchmarks.hot_paths [--news 100] [--comments 50]
+        [--requests 200] [--output report.json] [--baseline old.json]
+
+Во временной базе создаётся --news новостей по --comments комментариев,
+после чего тестовый клиент авторизованного автора прогоняет сценарии
+news:home, news:detail, создание, правку и удаление комментария. Отчёт и
+сравнение с --baseline описаны в benchmarks/harness.py.
+"""
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks import harness
+from news.models import Comment, News
+
+
+def add_arguments(parser):
+    parser.add_argument('--news', type=int, default=100)
+    parser.add_argument('--comments', type=int, default=50,
+                        help='Комментариев на новость.')
+
+
+def seed(args):
+    User = get_user_model()
+    author = User.objects.create(username='Автор')
+    reader = User.objects.create(username='Читатель')
+    news = News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости')
+        for index in range(args.news)
+    )
+    Comment.objects.bulk_create(
+        Comment(news=item, author=reader, text='Комментарий')
+        for item in news for _ in range(args.comments)
+    )
+    # Свои комментарии автора для правки и удаления, по одному на запрос.
+    own = Comment.objects.bulk_create(
+        Comment(news=news[0], author=author, text='Свой комментарий')
+        for _ in range(harness.WARMUP + args.requests)
+    )
+    News.recount_comments()
+    # testserver не входит в ALLOWED_HOSTS проекта.
+    client = Client(HTTP_HOST='localhost')
+    client.force_login(author)
+    detail_urls = [
+        reverse('news:detail', args=(item.pk,)) for item in news
+    ]
+    home_url = reverse('news:home')
+
+    def home(index):
+        return client.get(home_url)
+
+    def detail(index):
+        return client.get(detail_urls[index % len(detail_urls)])
+
+    def create(index):
+        return client.post(
+            detail_urls[index % len(detail_urls)],
+            data={'text': f'Новый комментарий {index}'},
+        )
+
+    def edit(index):
+        return client.post(
+            reverse('news:edit', args=(own[index].pk,)),
+            data={'text': f'Обновлённый комментарий {index}'},
+        )
+
+    def delete(index):
+        return client.post(reverse('news:delete', args=(own[index].pk,)))
+
+    return [
+        ('news:home', 200, home),
+        ('news:detail', 200, detail),
+        ('comment:create', 302, create),
+        ('comment:edit', 302, edit),
+        ('comment:delete', 302, delete),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main(__doc__, add_arguments, seed)
@@ -0,0 +1,58 @@
+"""Сравнение поиска плохих слов: прежний цикл и собранный matcher.
+
+Запуск: python -m benchmarks.profanity [--text-length 2000] [--number 200]
+"""
+import argparse
+import random
+import timeit
+
+from news.profanity import BadWordsMatcher
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+SIZES = (10, 1_000, 10_000)
+
+
+def random_words(count, rng):
+    """Случайные «кириллические» слова длиной от 4 до 12 букв."""
+    return tuple(
+        ''.join(rng.choices(ALPHABET, k=rng.randint(4, 12)))
+        for _ in range(count)
+    )
+
+
+def legacy_search(words, text):
+    """Поиск, как он был устроен в CommentForm.clean_text."""
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--text-length', type=int, default=2000)
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    # Текст без плохих слов — худший случай: просматривается целиком.
+    text = ' '.join(random_words(args.text_length // 6, rng))
+    text = text[:args.text_length]
+    print(f'{"слов":>8} {"цикл, мкс":>12} {"matcher, мкс":>14} '
+          f'{"ускорение":>10}')
+    for size in SIZES:
+        words = tuple(word + 'щщ' for word in random_words(size, rng))
+        matcher = BadWordsMatcher(words)
+        assert matcher.search(text) == legacy_search(words, text)
+        legacy = timeit.timeit(
+            lambda: legacy_search(words, text), number=args.number
+        ) / args.number * 1e6
+        compiled = timeit.timeit(
+            lambda: matcher.search(text), number=args.number
+        ) / args.number * 1e6
+        print(f'{size:>8} {legacy:>12.1f} {compiled:>14.1f} '
+              f'{legacy / compiled:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
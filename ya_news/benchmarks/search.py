@@ -0,0 +1,141 @@
+"""Скорость поиска по новостям: FTS5 против LIKE.
+
+Запуск: python -m benchmarks.search [--news 100000] [--comments 4]
+
+Корпус собирается из слов news/fixtures/news.json: заголовки и тексты
+новостей и комментариев — случайные последовательности этих слов с
+тем же распределением частот. Фикстура загружается командой load_news
+во временную базу, после чего для слов разной частоты замеряется первая
+страница поиска, первые десять страниц по курсору и поиск с комментариями;
+для сравнения — icontains по заголовку и тексту, который не ранжирует
+результаты и останавливается на первых двадцати совпадениях.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from collections import Counter
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Q
+
+from benchmarks import test_database
+from news.models import News
+from news.search import search_news
+
+FIXTURE = Path(__file__).resolve().parent.parent / 'news/fixtures/news.json'
+WORD = re.compile(r'\w{3,}')
+REPEATS = 20
+DEEP_PAGE = 10
+
+
+def vocabulary():
+    """Слова фикстуры и накопленные веса по их частоте."""
+    counts = Counter(
+        word.lower()
+        for item in json.loads(FIXTURE.read_text(encoding='utf-8'))
+        for field in ('title', 'text')
+        for word in WORD.findall(item['fields'][field])
+    )
+    words = [word for word, _ in counts.most_common()]
+    cum_weights, total = [], 0
+    for word in words:
+        total += counts[word]
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+def write_fixture(path, news_count, comments, words, cum_weights, rng):
+    def phrase(length):
+        return ' '.join(
+            rng.choices(words, cum_weights=cum_weights, k=length)
+        ).capitalize()
+
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write('[\n')
+        for pk in range(1, news_count + 1):
+            items = [{'model': 'news.news', 'pk': pk, 'fields': {
+                'title': phrase(6), 'text': phrase(40),
+                'date': '2022-11-01',
+            }}] + [{'model': 'news.comment', 'fields': {
+                'news': pk, 'author': 1, 'text': phrase(12),
+                'created': '2022-11-02T10:00:00Z',
+            }} for _ in range(comments)]
+            separator = ',\n' if pk < news_count else '\n'
+            file.write(',\n'.join(
+                json.dumps(item, ensure_ascii=False) for item in items
+            ) + separator)
+        file.write(']\n')
+
+
+def timed(function):
+    started = time.perf_counter()
+    for _ in range(REPEATS):
+        function()
+    return (time.perf_counter() - started) / REPEATS * 1000
+
+
+def deep_page(word):
+    cursor = None
+    for _ in range(DEEP_PAGE):
+        _, cursor = search_news(word, cursor)
+        if cursor is None:
+            break
+
+
+def like(word):
+    return list(News.objects.filter(
+        Q(title__icontains=word) | Q(text__icontains=word)
+    ).values('id', 'title', 'date', 'comment_count')[:20])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--news', type=int, default=100_000)
+    parser.add_argument('--comments', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    settings.DEBUG = False
+    rng = random.Random(args.seed)
+    words, cum_weights = vocabulary()
+    probes = {
+        'частое': words[0],
+        'среднее': words[len(words) // 4],
+        'редкое': words[-1],
+        # Без совпадений LIKE просматривает всю таблицу.
+        'отсутствующее': 'штормовое',
+    }
+    with tempfile.TemporaryDirectory() as directory, test_database():
+        path = os.path.join(directory, 'news.json')
+        write_fixture(
+            path, args.news, args.comments, words, cum_weights, rng
+        )
+        get_user_model().objects.create(pk=1, username='Автор')
+        started = time.perf_counter()
+        call_command('load_news', path, stdout=StringIO())
+        print(
+            f'Загружено {args.news} новостей и '
+            f'{args.news * args.comments} комментариев за '
+            f'{time.perf_counter() - started:.0f} с'
+        )
+        for label, word in probes.items():
+            print(f'{label} слово «{word}»:')
+            for name, function in (
+                ('FTS5', lambda: search_news(word)),
+                (f'FTS5, {DEEP_PAGE} стр.', lambda: deep_page(word)),
+                ('FTS5 + комм.',
+                 lambda: search_news(word, with_comments=True)),
+                ('LIKE', lambda: like(word)),
+            ):
+                print(f'  {name:<14} {timed(function):9.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
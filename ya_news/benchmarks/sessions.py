@@ -0,0 +1,81 @@
+"""Запросы к базе на странице news:detail в разных профилях сессий.
+
+Запуск: python -m benchmarks.sessions [--requests 200]
+
+Для каждого профиля YANEWS_SESSIONS (db, cached_db, signed_cookies)
+запускается отдельный процесс. Авторизованный клиент открывает страницу
+новости с комментариями; печатается среднее число SQL-запросов и время ответа.
+Профиль cached_db работает только с общим файловым кешем YANEWS_CACHE=file.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from benchmarks import test_database
+from news.models import Comment, News
+
+PROFILES = ('db', 'cached_db', 'signed_cookies')
+COMMENTS_COUNT = 20
+
+
+def child(requests):
+    """Замер в дочернем процессе с профилем из окружения."""
+    with test_database():
+        author = get_user_model().objects.create(username='Автор')
+        news = News.objects.create(title='Новость', text='Текст')
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text='Комментарий')
+            for _ in range(COMMENTS_COUNT)
+        )
+        # testserver не входит в ALLOWED_HOSTS проекта.
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(author)
+        url = reverse('news:detail', args=(news.pk,))
+        assert client.get(url).status_code == 200
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                client.get(url)
+        elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'queries': len(queries) / requests,
+        'ms': elapsed / requests * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sessions', '--child',
+             '--requests', str(args.requests)],
+            check=True, capture_output=True, text=True,
+            env={
+                **os.environ, 'YANEWS_SESSIONS': profile,
+                **({'YANEWS_CACHE': 'file'} if profile == 'cached_db'
+                   else {}),
+            },
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:<15} {result["queries"]:.1f} запросов, '
+              f'{result["ms"]:.2f} мс на запрос')
+
+
+if __name__ == '__main__':
+    main()
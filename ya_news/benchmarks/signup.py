@@ -0,0 +1,64 @@
+"""Скорость регистрации с обычными и тестовыми настройками.
+
+Запуск: python -m benchmarks.signup [--signups 50]
+
+Для yanews.settings (PBKDF2) и yanews.settings_test (MD5) запускается
+отдельный процесс, который регистрирует пользователей через страницу
+users:signup во временной базе. Печатается время одной регистрации.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks import test_database
+
+SETTINGS_MODULES = ('yanews.settings', 'yanews.settings_test')
+PASSWORD = 'Ne-prostoy-parol-42'
+
+
+def child(signups):
+    """Замер в дочернем процессе с настройками из окружения."""
+    with test_database():
+        # testserver не входит в ALLOWED_HOSTS проекта.
+        client = Client(HTTP_HOST='localhost')
+        url = reverse('users:signup')
+        started = time.perf_counter()
+        for index in range(signups):
+            response = client.post(url, data={
+                'username': f'user{index}',
+                'password1': PASSWORD,
+                'password2': PASSWORD,
+            })
+            assert response.status_code == 302
+        elapsed = time.perf_counter() - started
+    print(json.dumps({'ms': elapsed / signups * 1000}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--signups', type=int, default=50)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.signups)
+        return
+    for module in SETTINGS_MODULES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.signup', '--child',
+             '--signups', str(args.signups)],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': module},
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{module:<22} {result["ms"]:8.2f} мс на регистрацию')
+
+
+if __name__ == '__main__':
+    main()
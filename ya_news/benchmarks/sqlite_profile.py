@@ -0,0 +1,120 @@
+"""Чтение и запись под конкурентной нагрузкой с профилем SQLite и без.
+
+Запуск: python -m benchmarks.sqlite_profile [--readers 8] [--writers 2]
+
+Для каждого профиля (YANEWS_DB=default и YANEWS_DB=tuned) запускается
+отдельный процесс. Читатели открывают новость с комментариями, писатели
+добавляют комментарии; после каждой операции вызывается
+close_old_connections, как в конце запроса. Печатаются операции в
+секунду и число ошибок «database is locked».
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, close_old_connections, transaction
+
+from benchmarks import test_database
+from news.models import Comment, News
+
+PROFILES = ('default', 'tuned')
+NEWS_COUNT = 100
+
+
+def reader(deadline, results):
+    operations = errors = 0
+    pk = 0
+    while time.monotonic() < deadline:
+        pk = pk % NEWS_COUNT + 1
+        try:
+            news = News.objects.get(pk=pk)
+            list(news.comment_set.select_related('author')[:20])
+            operations += 1
+        except OperationalError:
+            errors += 1
+        finally:
+            close_old_connections()
+    results.append(('read', operations, errors))
+
+
+def writer(author, deadline, results):
+    operations = errors = 0
+    pk = 0
+    while time.monotonic() < deadline:
+        pk = pk % NEWS_COUNT + 1
+        try:
+            with transaction.atomic():
+                Comment.objects.create(news_id=pk, author=author,
+                                       text='Комментарий')
+                News.change_comment_count(pk, 1)
+            operations += 1
+        except OperationalError:
+            errors += 1
+        finally:
+            close_old_connections()
+    results.append(('write', operations, errors))
+
+
+def child(readers, writers, duration):
+    """Замер в дочернем процессе с профилем из окружения."""
+    with test_database():
+        author = get_user_model().objects.create(username='Автор')
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Текст')
+            for index in range(NEWS_COUNT)
+        )
+        close_old_connections()
+        deadline = time.monotonic() + duration
+        results = []
+        threads = [
+            threading.Thread(target=reader, args=(deadline, results))
+            for _ in range(readers)
+        ] + [
+            threading.Thread(target=writer, args=(author, deadline, results))
+            for _ in range(writers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    summary = {}
+    for kind, operations, errors in results:
+        total = summary.setdefault(kind, {'per_second': 0, 'errors': 0})
+        total['per_second'] += operations / duration
+        total['errors'] += errors
+    print(json.dumps(summary))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.readers, args.writers, args.duration)
+        return
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sqlite_profile', '--child',
+             '--readers', str(args.readers), '--writers', str(args.writers),
+             '--duration', str(args.duration)],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'YANEWS_DB': profile},
+        ).stdout
+        summary = json.loads(output.splitlines()[-1])
+        print(f'{profile}:')
+        for kind, total in summary.items():
+            print(f'  {kind:<6} {total["per_second"]:8.0f} операций/с, '
+                  f'ошибок: {total["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
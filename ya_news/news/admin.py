@@ -1,15 +1,94 @@
+from collections import Counter
+
 from django.contrib import admin
+from django.db import transaction
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
 
 from .models import Comment, News
 
 
-class CommentInline(admin.StackedInline):
+class RecentCommentsFormSet(BaseInlineFormSet):
+    """Формы только для последних комментариев новости."""
+
+    def get_queryset(self):
+        if not hasattr(self, '_recent_queryset'):
+            self._recent_queryset = super().get_queryset().order_by(
+                '-created', '-pk'
+            )[:CommentInline.max_shown]
+        return self._recent_queryset
+
+
+class CommentInline(admin.TabularInline):
+    """Последние комментарии новости только для просмотра.
+
+    Остальные открываются ссылкой на постраничный список комментариев,
+    поэтому страница новости не растёт вместе с их числом.
+    """
     model = Comment
+    formset = RecentCommentsFormSet
+    fields = readonly_fields = ('author', 'text', 'created')
+    max_shown = 20
     extra = 0
+    can_delete = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('author')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
 
 
 @admin.register(News)
 class NewsAdmin(admin.ModelAdmin):
+    list_display = ('title', 'date', 'comment_count')
+    readonly_fields = ('all_comments',)
     inlines = [
         CommentInline,
     ]
+
+    @admin.display(description='Комментарии')
+    def all_comments(self, news):
+        url = reverse('admin:news_comment_changelist')
+        return format_html(
+            '<a href="{}?news__id__exact={}">Все комментарии ({})</a>',
+            url, news.pk, news.comment_count
+        )
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'news', 'author', 'created')
+    list_select_related = ('news', 'author')
+    raw_id_fields = ('news',)
+    autocomplete_fields = ('author',)
+    # Точное число всех комментариев под фильтром не считается.
+    show_full_result_count = False
+    list_per_page = 50
+    ordering = ('-created', '-pk')
+
+    def save_model(self, request, obj, form, change):
+        """Сохраняет комментарий, сдвигая счётчики новостей."""
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change:
+                News.change_comment_count(obj.news_id, 1)
+            elif 'news' in form.changed_data:
+                News.change_comment_count(form.initial['news'], -1)
+                News.change_comment_count(obj.news_id, 1)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            News.change_comment_count(obj.news_id, -1)
+
+    def delete_queryset(self, request, queryset):
+        counts = Counter(queryset.values_list('news_id', flat=True))
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            for news_id, count in counts.items():
+                News.change_comment_count(news_id, -count)
@@ -0,0 +1,103 @@
+"""JSON API новостей и комментариев для мобильных клиентов.
+
+Ответы строятся из values() без создания моделей. Каждый ответ несёт
+ETag, посчитанный только по данным из базы: дате и времени правки новости,
+числу её комментариев, id последнего комментария и времени последней
+правки комментария. Поэтому ETag одинаков во всех процессах сервера и
+меняется, какой бы процесс ни записал правку. Если клиент присылает тот
+же ETag в If-None-Match, представление не вызывается: ответ 304 без тела
+стоит одного небольшого запроса.
+"""
+import hashlib
+from operator import itemgetter
+
+from django.conf import settings
+from django.db.models import F, Max, OuterRef, Subquery
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition, require_GET
+
+from .models import Comment, News
+from .pagination import comments_queryset, split_page
+
+NEWS_FIELDS = ('id', 'title', 'text', 'date', 'comment_count')
+COMMENT_FIELDS = ('id', 'text', 'created')
+
+
+def news_state(queryset):
+    """Строки (id, date, updated, comment_count и два признака комментариев).
+
+    Признаки комментариев — id последнего комментария и время последней
+    правки; вместе со счётчиком они меняются при добавлении, правке и
+    удалении комментария.
+    """
+    comments = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news')
+    return list(queryset.annotate(
+        last_comment=Subquery(
+            comments.annotate(last=Max('pk')).values('last')
+        ),
+        comments_updated=Subquery(
+            comments.annotate(last=Max('updated')).values('last')
+        ),
+    ).values_list(
+        'pk', 'date', 'updated', 'comment_count', 'last_comment',
+        'comments_updated',
+    ))
+
+
+def make_etag(state):
+    """Строит ETag по состоянию новостей; None, если новостей нет."""
+    if not state:
+        return None
+    return hashlib.blake2b(
+        repr(state).encode(), digest_size=16
+    ).hexdigest()
+
+
+def home_news():
+    return News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+
+def news_list_etag(request):
+    return make_etag(news_state(home_news()))
+
+
+def news_etag(request, pk):
+    return make_etag(news_state(News.objects.filter(pk=pk)))
+
+
+def json_response(data):
+    return JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+
+
+@require_GET
+@condition(etag_func=news_list_etag)
+def news_list(request):
+    """Новости главной страницы."""
+    return json_response({'results': list(home_news().values(*NEWS_FIELDS))})
+
+
+@require_GET
+@condition(etag_func=news_etag)
+def news_detail(request, pk):
+    """Одна новость."""
+    news = News.objects.filter(pk=pk).values(*NEWS_FIELDS).first()
+    if news is None:
+        raise Http404('Новость не найдена.')
+    return json_response(news)
+
+
+@require_GET
+@condition(etag_func=news_etag)
+def news_comments(request, pk):
+    """Страница комментариев новости; следующая — по курсору next."""
+    comments, next_cursor = split_page(
+        list(comments_queryset(pk, request.GET.get('after')).values(
+            *COMMENT_FIELDS, author_name=F('author__username')
+        )),
+        position=itemgetter('created', 'id'),
+    )
+    if not comments and not News.objects.filter(pk=pk).exists():
+        raise Http404('Новость не найдена.')
+    return json_response({'results': comments, 'next': next_cursor})
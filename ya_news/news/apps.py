@@ -1,7 +1,23 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from yanews.auth import forget_user
+        from yanews.db import tune_sqlite
+        from yanews.metrics import install_query_counter
+        from . import signals  # noqa: F401
+
+        connection_created.connect(tune_sqlite, dispatch_uid='tune_sqlite')
+        connection_created.connect(install_query_counter,
+                                   dispatch_uid='install_query_counter')
+        for signal in (post_save, post_delete):
+            signal.connect(forget_user, sender=get_user_model(),
+                           dispatch_uid='forget_user')
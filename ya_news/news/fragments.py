@@ -0,0 +1,86 @@
+"""Кеш отрисованных карточек новостей для главной страницы.
+
+Ключ карточки состоит из pk новости и её версии. Версия хранится в том же
+кеше и меняется при любой записи в новость или её комментарии, поэтому
+старые карточки не нужно удалять: они просто перестают запрашиваться.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+CARD_TEMPLATE = 'includes/news_card.html'
+VERSION_KEY = 'news:version:{pk}'
+CARD_KEY = 'news:card:{pk}:{version}'
+
+
+def bump_version(pk):
+    """Выдаёт новости новую версию, делая её карточку устаревшей."""
+    cache.set(VERSION_KEY.format(pk=pk), time.time_ns(), None)
+
+
+def get_versions(pks):
+    """Возвращает версии новостей, заводя недостающие."""
+    keys = {pk: VERSION_KEY.format(pk=pk) for pk in pks}
+    versions = cache.get_many(keys.values())
+    missing = {
+        key: time.time_ns() for key in keys.values() if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {pk: versions[key] for pk, key in keys.items()}
+
+
+def card_keys(pks, versions):
+    return {pk: CARD_KEY.format(pk=pk, version=versions[pk]) for pk in pks}
+
+
+def render_cards(pks):
+    """Возвращает HTML карточек новостей в порядке pks.
+
+    Из базы загружаются только новости, чьих карточек нет в кеше.
+    """
+    keys = card_keys(pks, get_versions(pks))
+    cards = cache.get_many(keys.values())
+    missing = [pk for pk in pks if keys[pk] not in cards]
+    if missing:
+        rendered = {
+            keys[news.pk]: render_to_string(CARD_TEMPLATE, {'news': news})
+            for news in News.objects.filter(pk__in=missing).order_by()
+        }
+        cache.set_many(rendered, settings.NEWS_CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[keys[pk]]) for pk in pks if keys[pk] in cards]
+
+
+async def aget_versions(pks):
+    """Асинхронный вариант get_versions."""
+    keys = {pk: VERSION_KEY.format(pk=pk) for pk in pks}
+    versions = await cache.aget_many(keys.values())
+    missing = {
+        key: time.time_ns() for key in keys.values() if key not in versions
+    }
+    if missing:
+        await cache.aset_many(missing, None)
+        versions.update(missing)
+    return {pk: versions[key] for pk, key in keys.items()}
+
+
+async def arender_cards(pks):
+    """Асинхронный вариант render_cards для ASGI-представлений."""
+    keys = card_keys(pks, await aget_versions(pks))
+    cards = await cache.aget_many(keys.values())
+    missing = [pk for pk in pks if keys[pk] not in cards]
+    if missing:
+        rendered = {
+            keys[news.pk]: render_to_string(CARD_TEMPLATE, {'news': news})
+            async for news in News.objects.filter(pk__in=missing).order_by()
+        }
+        await cache.aset_many(rendered, settings.NEWS_CARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    return [mark_safe(cards[keys[pk]]) for pk in pks if keys[pk] in cards]
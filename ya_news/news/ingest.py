@@ -0,0 +1,145 @@
+"""Отложенная запись комментариев пачками.
+
+В режиме COMMENT_INGEST_MODE = 'queue' проверенный формой комментарий
+кладётся в очередь процесса, а пользователь сразу получает редирект.
+Фоновый поток забирает комментарии пачками до COMMENT_BATCH_SIZE штук
+или за COMMENT_FLUSH_INTERVAL секунд и пишет их одним bulk_create вместе
+с обновлением счётчиков. Если очередь заполнена, put() возвращает False,
+и представление записывает комментарий само, как без очереди.
+
+Время created комментарий получает при записи пачки, а не при отправке
+формы, поэтому на странице он появляется с задержкой до интервала.
+При завершении процесса очередь дописывается в базу.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+from functools import partial
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from .fragments import bump_version
+from .models import Comment, News
+
+logger = logging.getLogger(__name__)
+
+
+class CommentQueue:
+    """Ограниченная очередь комментариев с фоновым потоком записи."""
+
+    def __init__(self, max_size, batch_size, interval):
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue = queue.Queue(maxsize=max_size)
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def put(self, comment):
+        """Ставит комментарий в очередь; False, если места нет."""
+        self.start()
+        try:
+            self._queue.put_nowait(comment)
+        except queue.Full:
+            return False
+        return True
+
+    def start(self):
+        """Запускает поток записи, если он ещё не работает."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(
+                target=self._run, name='comment-ingest', daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def flush(self):
+        """Ждёт, пока все поставленные комментарии будут записаны."""
+        self._queue.join()
+
+    def stop(self):
+        """Дописывает очередь и останавливает поток записи."""
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is None:
+            return
+        self._stopping.set()
+        thread.join()
+        atexit.unregister(self.stop)
+
+    def _run(self):
+        try:
+            while not (self._stopping.is_set() and self._queue.empty()):
+                batch = self._collect()
+                if batch:
+                    self._write(batch)
+        finally:
+            connection.close()
+
+    def _collect(self):
+        """Пачка: первый комментарий и всё, что придёт за интервал."""
+        try:
+            batch = [self._queue.get(timeout=self.interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        try:
+            try:
+                save_comments(batch)
+            except DatabaseError:
+                # Пачка откатилась целиком, например из-за удалённой
+                # новости: сохраняем комментарии по одному.
+                logger.exception('Не удалось записать пачку комментариев.')
+                for comment in batch:
+                    # bulk_create успел выдать объектам id откатившейся
+                    # вставки; их уже могли занять другие записи.
+                    comment.pk = None
+                    comment._state.adding = True
+                    try:
+                        save_comments([comment])
+                    except DatabaseError:
+                        logger.exception(
+                            'Комментарий к новости %s потерян.',
+                            comment.news_id
+                        )
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+
+def save_comments(comments):
+    """Записывает комментарии и сдвигает счётчики их новостей."""
+    with transaction.atomic():
+        Comment.objects.bulk_create(comments)
+        for news_id, count in Counter(
+            comment.news_id for comment in comments
+        ).items():
+            News.change_comment_count(news_id, count)
+            # bulk_create не шлёт post_save, карточку сбрасываем сами.
+            transaction.on_commit(partial(bump_version, news_id))
+
+
+comment_queue = CommentQueue(
+    settings.COMMENT_QUEUE_SIZE,
+    settings.COMMENT_BATCH_SIZE,
+    settings.COMMENT_FLUSH_INTERVAL,
+)
@@ -0,0 +1,130 @@
+import random
+import time
+from datetime import datetime, time as day_start, timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from news.models import Comment, News
+from news.streaming import keep_fixture_dates
+from news.synthetic import TextGenerator, zipf_counts, zipf_cum_weights
+
+
+def batches(items, size):
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетических пользователей, новости и комментарии '
+        'с русским текстом. Комментарии распределяются по новостям и '
+        'авторам по закону Ципфа; одно и то же зерно даёт одни и те же '
+        'данные. Строки пишутся пачками bulk_create в одной транзакции, '
+        'внешние ключи проверяются один раз в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=100_000,
+                            help='всего комментариев')
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--exponent', type=float, default=1.1,
+                            help='показатель распределения Ципфа')
+        parser.add_argument('--days', type=int, default=365,
+                            help='за сколько дней до сегодня даты новостей')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        text = TextGenerator(rng)
+        started = time.perf_counter()
+        # На SQLite внешние ключи отключаются только вне транзакции.
+        with connection.constraint_checks_disabled(), keep_fixture_dates(
+            Comment
+        ), transaction.atomic():
+            user_ids = self.create_users(options)
+            news = self.create_news(options, rng, text)
+            self.create_comments(options, rng, text, news, user_ids)
+            connection.check_constraints(table_names=[
+                Comment._meta.db_table, News._meta.db_table
+            ])
+        total = options['users'] + options['news'] + options['comments']
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
+
+    def create_users(self, options):
+        User = get_user_model()
+        ids = []
+        for batch in batches((
+            User(
+                username=f'synthetic_{options["seed"]}_{index}',
+                # Без хеширования: войти под такими пользователями нельзя.
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+            for index in range(options['users'])
+        ), options['batch_size']):
+            ids += [user.pk for user in User.objects.bulk_create(batch)]
+        return ids
+
+    def create_news(self, options, rng, text):
+        """Новости с уже известным числом комментариев каждой."""
+        counts = zipf_counts(
+            options['comments'], options['news'], options['exponent'], rng
+        )
+        today = timezone.localdate()
+        title_length = News._meta.get_field('title').max_length
+        news = []
+        for batch in batches((
+            News(
+                title=text.title(title_length),
+                text=text.text(),
+                date=today - timedelta(days=rng.randrange(options['days'])),
+                comment_count=count,
+            )
+            for count in counts
+        ), options['batch_size']):
+            news += [
+                (item.pk, item.date, item.comment_count)
+                for item in News.objects.bulk_create(batch)
+            ]
+            self.progress(options, 'новостей', len(news))
+        return news
+
+    def create_comments(self, options, rng, text, news, user_ids):
+        # Активность авторов тоже по Ципфу: немногие пишут большую часть.
+        cum_weights = zipf_cum_weights(len(user_ids), options['exponent'])
+        timezone_info = timezone.get_current_timezone()
+
+        def comments():
+            for news_id, date, count in news:
+                published = datetime.combine(
+                    date, day_start(), tzinfo=timezone_info
+                )
+                authors = rng.choices(user_ids, cum_weights, k=count)
+                for author_id in authors:
+                    yield Comment(
+                        news_id=news_id, author_id=author_id,
+                        text=text.sentence(),
+                        created=published + timedelta(
+                            seconds=rng.randrange(7 * 24 * 60 * 60)
+                        ),
+                    )
+
+        created = 0
+        for batch in batches(comments(), options['batch_size']):
+            Comment.objects.bulk_create(batch)
+            created += len(batch)
+            self.progress(options, 'комментариев', created)
+
+    def progress(self, options, what, count):
+        if options['verbosity'] > 1:
+            self.stdout.write(f'{what}: {count}')
@@ -0,0 +1,57 @@
+import time
+from contextlib import ExitStack
+from itertools import islice
+
+from django.core import serializers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import Comment, News
+from news.streaming import iter_json_array, keep_fixture_dates, open_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает фикстуру в формате loaddata (в том числе .gz) '
+        'пачками через bulk_create в одной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            fixture = stack.enter_context(open_fixture(options['path']))
+            for model in (News, Comment):
+                stack.enter_context(keep_fixture_dates(model))
+            stack.enter_context(transaction.atomic())
+            total, models = self.load(
+                iter_json_array(fixture), options['batch_size'],
+                options['verbosity'], started,
+            )
+            if Comment in models:
+                News.recount_comments()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
+
+    def load(self, items, batch_size, verbosity, started):
+        total, models = 0, set()
+        while batch := list(islice(items, batch_size)):
+            by_model = {}
+            for item in serializers.deserialize('python', batch):
+                by_model.setdefault(type(item.object), []).append(
+                    item.object
+                )
+            for model, objects in by_model.items():
+                model.objects.bulk_create(objects)
+            models.update(by_model)
+            total += len(batch)
+            if verbosity > 1:
+                rate = total / (time.perf_counter() - started)
+                self.stdout.write(f'{total} объектов, {rate:.0f} в секунду')
+        return total, models
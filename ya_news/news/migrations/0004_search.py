@@ -0,0 +1,66 @@
+from django.db import migrations
+
+# Полнотекстовые индексы (FTS5) с внешним содержимым: текст хранится
+# только в таблицах новостей и комментариев, индексы обновляют триггеры
+# при любой вставке, правке и удалении, в том числе из bulk_create.
+TABLES = (
+    ('news_news', 'news_news_fts', ('title', 'text')),
+    ('news_comment', 'news_comment_fts', ('text',)),
+)
+
+
+def trigger_sql(table, index, columns):
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    delete = (
+        f"INSERT INTO {index} ({index}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    insert = f'INSERT INTO {index} (rowid, {names}) VALUES (new.id, {new});'
+    return (
+        f'CREATE TRIGGER {index}_insert AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {index}_delete AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {index}_update AFTER UPDATE OF {names} ON {table} '
+        f'BEGIN {delete} {insert} END',
+    )
+
+
+def drop_trigger_sql(table, index, columns):
+    return (
+        f'DROP TRIGGER {index}_update',
+        f'DROP TRIGGER {index}_delete',
+        f'DROP TRIGGER {index}_insert',
+    )
+
+
+def create_sql(table, index, columns):
+    names = ', '.join(columns)
+    return (
+        f"CREATE VIRTUAL TABLE {index} USING fts5({names}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        *trigger_sql(table, index, columns),
+        f"INSERT INTO {index} ({index}) VALUES ('rebuild')",
+    )
+
+
+def drop_sql(table, index, columns):
+    return (
+        *drop_trigger_sql(table, index, columns),
+        f'DROP TABLE {index}',
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_access_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(create_sql(*table), drop_sql(*table))
+        for table in TABLES
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 19:02
+
+from importlib import import_module
+
+from django.conf import settings
+from django.db import migrations, models
+
+search = import_module('news.migrations.0004_search')
+
+# SQLite добавляет поле, пересоздавая таблицу, а вместе со старой
+# таблицей удаляются и триггеры полнотекстовых индексов из 0004_search.
+# Сами индексы не меняются: строки копируются с теми же id.
+drop_triggers = [
+    migrations.RunSQL(
+        search.drop_trigger_sql(*table), search.trigger_sql(*table)
+    )
+    for table in search.TABLES
+]
+create_triggers = [
+    migrations.RunSQL(
+        search.trigger_sql(*table), search.drop_trigger_sql(*table)
+    )
+    for table in search.TABLES
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        *drop_triggers,
+        migrations.AddField(
+            model_name='comment',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='updated',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['news', 'updated'], name='comment_news_updated_idx'),
+        ),
+        *create_triggers,
+    ]
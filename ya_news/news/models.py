@@ -2,21 +2,71 @@ from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('-date',), name='news_date_desc_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Сохраняет новость, не записывая счётчик комментариев.
+
+        Счётчик меняют только атомарные UPDATE из change_comment_count и
+        recount_comments. Полное сохранение объекта, загруженного раньше,
+        затёрло бы сдвиги, сделанные за это время, например при правке
+        заголовка в админке. Явный update_fields со счётчиком работает.
+        """
+        if (
+            not self._state.adding
+            and not kwargs.get('force_insert')
+            and kwargs.get('update_fields') is None
+        ):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'comment_count'
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def change_comment_count(cls, pk, delta):
+        """Атомарно сдвигает счётчик комментариев новости на delta.
+
+        Счётчик не уходит в минус, даже если успел разойтись с таблицей
+        комментариев: пересчитать его можно командой recount_comments.
+        """
+        queryset = cls.objects.filter(pk=pk)
+        if delta < 0:
+            queryset = queryset.filter(comment_count__gte=-delta)
+        queryset.update(comment_count=F('comment_count') + delta)
+
+    @classmethod
+    def recount_comments(cls):
+        """Пересчитывает счётчики всех новостей одним UPDATE."""
+        counts = Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by().values('news').annotate(
+            total=Count('pk')
+        ).values('total')
+        return cls.objects.update(
+            comment_count=Coalesce(Subquery(counts), Value(0))
+        )
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -29,9 +79,20 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'),
+                name='comment_news_created_idx',
+            ),
+            models.Index(
+                fields=('news', 'updated'),
+                name='comment_news_updated_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,79 @@
+"""Курсорная (keyset) пагинация ленты комментариев.
+
+Курсор указывает на последний показанный комментарий парой (created, id),
+поэтому следующая страница выбирается условием по индексу, а не OFFSET:
+глубокие страницы обходятся так же дёшево, как первая.
+"""
+from datetime import datetime, timedelta, timezone
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import Http404
+
+from .models import Comment
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+# Наибольший id, который SQLite принимает как INTEGER.
+MAX_ID = 2 ** 63 - 1
+
+
+def encode_cursor(created, pk):
+    """Кодирует позицию комментария в строку для адреса."""
+    return f'{(created - EPOCH) // MICROSECOND}-{pk}'
+
+
+def decode_cursor(cursor):
+    """Разбирает курсор обратно в пару (created, id)."""
+    try:
+        micros, pk = (int(part) for part in cursor.split('-'))
+        created = EPOCH + micros * MICROSECOND
+    except (ValueError, OverflowError):
+        raise Http404('Некорректный курсор.')
+    if not 0 < pk <= MAX_ID:
+        raise Http404('Некорректный курсор.')
+    return created, pk
+
+
+def comments_queryset(news_id, cursor=None):
+    """Запрос очередной страницы комментариев новости.
+
+    Выбирается на один комментарий больше размера страницы, чтобы
+    без отдельного запроса понять, есть ли следующая страница.
+    """
+    comments = Comment.objects.filter(
+        news_id=news_id
+    ).select_related('author').order_by('created', 'pk')
+    if cursor:
+        created, pk = decode_cursor(cursor)
+        comments = comments.filter(
+            Q(created__gt=created) | Q(created=created, pk__gt=pk)
+        )
+    return comments[:settings.COMMENTS_PAGE_SIZE + 1]
+
+
+def split_page(comments, position=attrgetter('created', 'pk')):
+    """Отделяет страницу от лишнего комментария и строит курсор.
+
+    position достаёт из комментария пару (created, id); для словарей
+    из values() её передают через itemgetter.
+    """
+    page_size = settings.COMMENTS_PAGE_SIZE
+    if len(comments) <= page_size:
+        return comments, None
+    return comments[:page_size], encode_cursor(
+        *position(comments[page_size - 1])
+    )
+
+
+def comments_page(news_id, cursor=None):
+    """Возвращает комментарии страницы и курсор следующей страницы."""
+    return split_page(list(comments_queryset(news_id, cursor)))
+
+
+async def acomments_page(news_id, cursor=None):
+    """Асинхронный вариант comments_page."""
+    return split_page(
+        [comment async for comment in comments_queryset(news_id, cursor)]
+    )
@@ -0,0 +1,79 @@
+"""Поиск запрещённых слов в тексте комментария."""
+import re
+
+
+def _node_pattern(node):
+    """Сворачивает узел префиксного дерева в регулярное выражение."""
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    if len(branches) == 1 and '' not in node:
+        return branches[0]
+    pattern = '(?:' + '|'.join(branches) + ')'
+    return pattern + '?' if '' in node else pattern
+
+
+def trie_pattern(words):
+    """Строит одно выражение, совпадающее с любым словом из списка.
+
+    Слова складываются в префиксное дерево, поэтому общие начала
+    проверяются один раз, а не для каждого слова отдельно.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+class BadWordsMatcher:
+    """Ищет в тексте любое слово из списка за один проход.
+
+    Сравнение ведётся без учёта регистра (casefold). В режиме whole_words
+    слово должно стоять отдельно, иначе ищется любое вхождение подстрокой.
+    """
+
+    def __init__(self, words, whole_words=False):
+        self.source = words
+        self.whole_words = whole_words
+        self._originals = {
+            word.casefold(): word for word in words if word
+        }
+        pattern = trie_pattern(self._originals)
+        if whole_words:
+            pattern = rf'(?<!\w)(?:{pattern})(?!\w)'
+        self._regex = re.compile(pattern) if self._originals else None
+
+    def search(self, text):
+        """Возвращает найденное слово из списка или None."""
+        if self._regex is None:
+            return None
+        match = self._regex.search(text.casefold())
+        if match is None:
+            return None
+        return self._originals[match.group()]
+
+
+_matcher = None
+
+
+def get_matcher(words, whole_words=False):
+    """Возвращает собранный matcher для списка слов.
+
+    Matcher пересобирается, только когда передан другой объект списка,
+    поэтому список обновляют заменой целиком, а не изменением на месте.
+    """
+    global _matcher
+    matcher = _matcher
+    if (
+        matcher is None
+        or matcher.source is not words
+        or matcher.whole_words != whole_words
+    ):
+        matcher = _matcher = BadWordsMatcher(words, whole_words)
+    return matcher
@@ -1,12 +1,17 @@
 import pytest
 
+from copy import deepcopy
 from datetime import datetime, timedelta
 
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.utils import timezone
 from django.test.client import Client
 
 from news.models import News, Comment
 from news.pytest_tests import settings
+from news.streaming import keep_fixture_dates
 
 
 @pytest.fixture(autouse=True)
@@ -14,30 +19,89 @@ def enable_db_access_for_all_tests(db):
     pass
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кеш общий для всех тестов процесса: чистим его между тестами.
+    cache.clear()
+
+
+@pytest.fixture(scope='session', autouse=True)
+def logged_in_users(django_db_setup, django_db_blocker):
+    """Пользователи и куки их сессий, общие для всего прогона.
+
+    Создаются один раз до транзакции первого теста, поэтому откат теста
+    их не удаляет. Без autouse фикстура могла бы впервые понадобиться
+    через lazy_fixture, уже внутри транзакции теста.
+
+    Тесты с transaction=True очищают базу целиком и должны помечаться
+    serialized_rollback=True: для них снимок базы сериализуется заново
+    уже с пользователями и сессиями.
+    """
+    users = {}
+    with django_db_blocker.unblock():
+        for username, is_admin in (
+            (settings.AUTHOR_USER_NAME, False),
+            (settings.NOT_AUTHOR_USER_NAME, False),
+            (settings.ADMIN_USER_NAME, True),
+        ):
+            # Пароль не задаётся: хеширование стоило бы дороже теста.
+            user = get_user_model().objects.create(
+                username=username, is_staff=is_admin, is_superuser=is_admin
+            )
+            client = Client()
+            client.force_login(user)
+            users[username] = (
+                user, client.cookies[settings.SESSION_COOKIE_NAME].value
+            )
+        # Снимок для serialized_rollback create_test_db снял до появления
+        # пользователей; заменяем его, чтобы откат их восстанавливал.
+        # Атрибут приватный: его читает TransactionTestCase в Django 5.1,
+        # которым pytest-django 4.9 откатывает базу. При обновлении любого
+        # из них проверьте, что имя и формат снимка не изменились.
+        connection._test_serialized_contents = (
+            connection.creation.serialize_db_to_string()
+        )
+    return users
+
+
+def logged_in_client(logged_in_users, username):
+    """Новый клиент с готовой сессией пользователя, без force_login."""
+    client = Client()
+    client.cookies[settings.SESSION_COOKIE_NAME] = (
+        logged_in_users[username][1]
+    )
+    return client
+
+
 @pytest.fixture
-def author(django_user_model):
-    return django_user_model.objects.create(
-        username=settings.AUTHOR_USER_NAME)
+def author(logged_in_users):
+    # Копия, чтобы изменения объекта в тесте не достались следующим.
+    return deepcopy(logged_in_users[settings.AUTHOR_USER_NAME][0])
 
 
 @pytest.fixture
-def not_author(django_user_model):
-    return django_user_model.objects.create(
-        username=settings.NOT_AUTHOR_USER_NAME)
+def not_author(logged_in_users):
+    return deepcopy(logged_in_users[settings.NOT_AUTHOR_USER_NAME][0])
 
 
 @pytest.fixture
-def author_client(author):
-    client = Client()
-    client.force_login(author)  # Логиним автора в клиенте.
-    return client
+def admin_user(logged_in_users):
+    return deepcopy(logged_in_users[settings.ADMIN_USER_NAME][0])
 
 
 @pytest.fixture
-def not_author_client(not_author):
-    client = Client()
-    client.force_login(not_author)  # Логиним обычного пользователя в клиенте.
-    return client
+def author_client(logged_in_users):
+    return logged_in_client(logged_in_users, settings.AUTHOR_USER_NAME)
+
+
+@pytest.fixture
+def not_author_client(logged_in_users):
+    return logged_in_client(logged_in_users, settings.NOT_AUTHOR_USER_NAME)
+
+
+@pytest.fixture
+def admin_client(logged_in_users):
+    return logged_in_client(logged_in_users, settings.ADMIN_USER_NAME)
 
 
 @pytest.fixture
@@ -77,17 +141,24 @@ def one_comment(one_news, author):
     )
 
 
+@pytest.fixture
+def one_comment_pk_for_arg(one_comment):
+    return (one_comment.pk,)
+
+
 @pytest.fixture
 def a_lot_of_comments(one_news, author):
     now = timezone.now()
-    # Создаём комментарии в цикле от имени author
-    for index in range(settings.COMMENTS_COUNT):
-        comment = Comment.objects.create(
-            news=one_news,
-            author=author,
-            text=f'{settings.COMMENT_TEXT} {index}',
+    # Комментарии от имени author создаются одним запросом сразу
+    # с нужным временем создания.
+    with keep_fixture_dates(Comment):
+        Comment.objects.bulk_create(
+            Comment(
+                news=one_news,
+                author=author,
+                text=f'{settings.COMMENT_TEXT} {index}',
+                created=now + timedelta(days=index),
+            )
+            for index in range(settings.COMMENTS_COUNT)
         )
-        # Сразу после создания меняем время создания комментария.
-        comment.created = now + timedelta(days=index)
-        comment.save()
     return Comment.objects.all()
@@ -6,6 +6,9 @@ NEWS_COUNT_ON_HOME_PAGE = settings.NEWS_COUNT_ON_HOME_PAGE
 
 AUTHOR_USER_NAME = 'Автор'
 NOT_AUTHOR_USER_NAME = 'Не автор'
+ADMIN_USER_NAME = 'Админ'
+SIGNUP_USER_NAME = 'new_user'
+SESSION_COOKIE_NAME = settings.SESSION_COOKIE_NAME
 
 COMMENTS_COUNT = 10
 COMMENT_TEXT = 'Tекст комментария'
@@ -14,11 +17,24 @@ NEW_COMMENT_TEXT = 'Обновлённый комментарий'
 NEWS_TITLE = 'Новость'
 NEWS_TEXT = 'Текст новости'
 
+SEARCH_PAGE_SIZE = 3
+
+CONCURRENT_REQUESTS = 20
+
 NEWS_HOME_NAME = 'news:home'
 NEWS_DETAIL_NAME = 'news:detail'
+NEWS_HOME_ASYNC_NAME = 'news:home_async'
+NEWS_DETAIL_ASYNC_NAME = 'news:detail_async'
+NEWS_COMMENTS_NAME = 'news:comments'
+NEWS_SEARCH_NAME = 'news:search'
 NEWS_EDIT_NAME = 'news:edit'
+NEWS_API_LIST_NAME = 'news:api_list'
+NEWS_API_DETAIL_NAME = 'news:api_detail'
+NEWS_API_COMMENTS_NAME = 'news:api_comments'
 NEWS_DELETE_NAME = 'news:delete'
 
+REQUEST_STATS_NAME = 'request_stats'
+
 USER_LOGIN_NAME = 'users:login'
 USER_LOGOUT_NAME = 'users:logout'
 USER_SIGNUP_NAME = 'users:signup'
@@ -1,9 +1,26 @@
+import asyncio
+import re
+from http import HTTPStatus
+
 import pytest
 
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
+from news.admin import CommentInline
 from news.forms import CommentForm
+from news.models import Comment, News
 from news.pytest_tests import settings
+from yanews.metrics import stats
+
+# Полный просмотр таблицы в выводе EXPLAIN QUERY PLAN выглядит
+# как «SCAN <таблица>» без упоминания индекса.
+FULL_SCAN = re.compile(r'^SCAN \S+$')
 
 
 def test_news_count(a_lot_of_news, client):
@@ -35,6 +52,9 @@ def test_comments_order(one_news, a_lot_of_comments, client):
     assert all_timestamps == sorted_timestamps
 
 
+@pytest.mark.parametrize(
+    'name', (settings.NEWS_DETAIL_NAME, settings.NEWS_DETAIL_ASYNC_NAME)
+)
 @pytest.mark.parametrize(
     'parametrized_client, form_on_page',
     (
@@ -42,10 +62,353 @@ def test_comments_order(one_news, a_lot_of_comments, client):
         (pytest.lazy_fixture('client'), False),
     )
 )
-def test_pages_contains_form(parametrized_client, form_on_page, one_news):
+def test_pages_contains_form(
+    parametrized_client, form_on_page, one_news, name
+):
     """Проверка наличия/отсутсвия формы отправки комментария."""
-    url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+    url = reverse(name, args=(one_news.pk,))
     response = parametrized_client.get(url)
     assert ('form' in response.context) is form_on_page
     if form_on_page:
         assert isinstance(response.context['form'], CommentForm)
+
+
+def test_home_page_does_not_load_comments(
+    one_news, a_lot_of_comments, client, django_assert_num_queries
+):
+    """Проверка, что главная не загружает комментарии новостей."""
+    url = reverse(settings.NEWS_HOME_NAME)
+    # Первый запрос загружает новости и кладёт карточки в кеш.
+    with django_assert_num_queries(2):
+        client.get(url)
+    # Дальше загружается только список pk свежих новостей.
+    with django_assert_num_queries(1):
+        client.get(url)
+
+
+def test_home_card_refreshes_after_comment(
+    one_news, author_client, client, django_capture_on_commit_callbacks
+):
+    """Проверка, что новый комментарий сбрасывает карточку новости."""
+    home_url = reverse(settings.NEWS_HOME_NAME)
+    assert 'Комментариев' not in client.get(home_url).content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(
+            reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,)),
+            data={'text': settings.COMMENT_TEXT}
+        )
+    assert 'Комментариев: 1' in client.get(home_url).content.decode()
+
+
+def test_comments_keyset_pagination(one_news, a_lot_of_comments, client):
+    """Проверка постраничной выдачи комментариев по курсору."""
+    with override_settings(COMMENTS_PAGE_SIZE=3):
+        response = client.get(reverse(settings.NEWS_DETAIL_NAME,
+                                      args=(one_news.pk,)))
+        pages = [response.context['comments']]
+        cursor = response.context['next_cursor']
+        url = reverse(settings.NEWS_COMMENTS_NAME, args=(one_news.pk,))
+        with CaptureQueriesContext(connection) as queries:
+            while cursor:
+                response = client.get(url, {'after': cursor})
+                pages.append(response.context['comments'])
+                cursor = response.context['next_cursor']
+    assert all(len(page) <= 3 for page in pages)
+    shown = [comment.pk for page in pages for comment in page]
+    assert shown == [comment.pk for comment in a_lot_of_comments]
+    # Глубокие страницы выбираются по курсору, а не через OFFSET.
+    assert not any('OFFSET' in query['sql'] for query in queries)
+
+
+def query_plan(sql):
+    """План выполнения запроса в SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize(
+    'name, args, table',
+    (
+        (settings.NEWS_HOME_NAME, None, 'news_news'),
+        (settings.NEWS_DETAIL_NAME,
+         pytest.lazy_fixture('one_news_pk_for_arg'), 'news_comment'),
+    )
+)
+def test_main_queries_use_indexes(
+    name, args, table, a_lot_of_news, a_lot_of_comments, client
+):
+    """Проверка, что основной запрос страницы идёт по индексу."""
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse(name, args=args))
+    main_queries = [
+        query['sql'] for query in queries
+        if f'FROM "{table}"' in query['sql']
+    ]
+    assert main_queries
+    for sql in main_queries:
+        for step in query_plan(sql):
+            assert not FULL_SCAN.match(step), step
+            assert 'TEMP B-TREE' not in step, step
+
+
+def test_request_stats_report(one_news, client, admin_client):
+    """Проверка сводки замеров запросов по именам адресов."""
+    stats.clear()
+    client.get(reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,)))
+    report = admin_client.get(reverse(settings.REQUEST_STATS_NAME)).json()
+    detail = report[settings.NEWS_DETAIL_NAME]
+    assert detail['count'] == 1
+    # Новость и первая страница комментариев.
+    assert detail['queries'] == {'p50': 2, 'p95': 2, 'p99': 2}
+    assert detail['wall_ms']['p99'] >= detail['template_ms']['p99'] > 0
+
+
+def test_request_over_budget_is_logged(one_news, client, caplog):
+    """Проверка записи в лог запросов, превысивших бюджет."""
+    budgets = {settings.NEWS_DETAIL_NAME: {'queries': 1}}
+    with override_settings(REQUEST_BUDGETS=budgets):
+        client.get(reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,)))
+    assert 'news:detail превысил бюджет: queries=2' in caplog.text
+
+
+def test_async_home_matches_sync(a_lot_of_news, author_client):
+    """Проверка, что асинхронная главная совпадает с синхронной."""
+    sync_response = author_client.get(reverse(settings.NEWS_HOME_NAME))
+    async_response = author_client.get(
+        reverse(settings.NEWS_HOME_ASYNC_NAME)
+    )
+    assert async_response.content == sync_response.content
+
+
+def test_async_detail_matches_sync(one_news, a_lot_of_comments, client):
+    """Проверка комментариев на асинхронной странице новости."""
+    url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+    async_url = reverse(settings.NEWS_DETAIL_ASYNC_NAME, args=(one_news.pk,))
+    sync_context = client.get(url).context
+    async_context = client.get(async_url).context
+    assert async_context['news'] == sync_context['news']
+    assert async_context['comments'] == sync_context['comments']
+    assert async_context['next_cursor'] == sync_context['next_cursor']
+
+
+def test_async_detail_is_measured_under_asgi(one_news, admin_client):
+    """Проверка замеров асинхронной страницы через ASGI-обработчик."""
+    stats.clear()
+    url = reverse(settings.NEWS_DETAIL_ASYNC_NAME, args=(one_news.pk,))
+    response = async_to_sync(AsyncClient().get)(url)
+    assert response.status_code == 200
+    report = admin_client.get(reverse(settings.REQUEST_STATS_NAME)).json()
+    # Новость и первая страница комментариев, как и у синхронной версии.
+    assert report[settings.NEWS_DETAIL_ASYNC_NAME]['queries']['p50'] == 2
+
+
+def test_concurrent_async_requests_are_measured_apart(
+    one_news, admin_client, caplog
+):
+    """Проверка, что конкурентные ASGI-запросы не смешивают замеры."""
+    stats.clear()
+    url = reverse(settings.NEWS_DETAIL_ASYNC_NAME, args=(one_news.pk,))
+    client = AsyncClient()
+
+    async def get_all():
+        return await asyncio.gather(*(
+            client.get(url) for _ in range(settings.CONCURRENT_REQUESTS)
+        ))
+
+    responses = async_to_sync(get_all)()
+    assert all(response.status_code == 200 for response in responses)
+    report = admin_client.get(reverse(settings.REQUEST_STATS_NAME)).json()
+    detail = report[settings.NEWS_DETAIL_ASYNC_NAME]
+    assert detail['count'] == settings.CONCURRENT_REQUESTS
+    assert detail['queries'] == {'p50': 2, 'p95': 2, 'p99': 2}
+    assert 'превысил бюджет' not in caplog.text
+
+
+def test_api_news_list_matches_home(a_lot_of_news, client):
+    """Проверка списка новостей в JSON API."""
+    results = client.get(reverse(settings.NEWS_API_LIST_NAME)).json()
+    dates = [news['date'] for news in results['results']]
+    assert len(dates) == settings.NEWS_COUNT_ON_HOME_PAGE
+    assert dates == sorted(dates, reverse=True)
+
+
+@pytest.mark.parametrize(
+    'name', (settings.NEWS_COMMENTS_NAME, settings.NEWS_API_COMMENTS_NAME)
+)
+@pytest.mark.parametrize(
+    'cursor', ('abc', '1-2-3', '99999999999999999999-1',
+               '1-99999999999999999999')
+)
+def test_bad_comments_cursor_is_not_found(name, cursor, one_news, client):
+    """Проверка ответа 404 на испорченный курсор комментариев."""
+    response = client.get(reverse(name, args=(one_news.pk,)),
+                          {'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_api_comments_pagination(one_news, a_lot_of_comments, client):
+    """Проверка постраничной выдачи комментариев в JSON API."""
+    url = reverse(settings.NEWS_API_COMMENTS_NAME, args=(one_news.pk,))
+    shown, cursor = [], None
+    with override_settings(COMMENTS_PAGE_SIZE=3):
+        while True:
+            page = client.get(url, {'after': cursor} if cursor else {}).json()
+            shown += [comment['id'] for comment in page['results']]
+            cursor = page['next']
+            if cursor is None:
+                break
+    assert shown == [comment.pk for comment in a_lot_of_comments]
+    assert page['results'][-1]['author_name'] == settings.AUTHOR_USER_NAME
+
+
+@pytest.mark.parametrize(
+    'name', (settings.NEWS_API_DETAIL_NAME, settings.NEWS_API_COMMENTS_NAME)
+)
+def test_api_conditional_get(
+    name, one_news, one_comment, client, author_client,
+    django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """Проверка ответа 304 по ETag и смены ETag после комментария."""
+    url = reverse(name, args=(one_news.pk,))
+    etag = client.get(url)['ETag']
+    # Неизменившаяся новость стоит одного запроса и пустого ответа.
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response.content == b''
+    with django_capture_on_commit_callbacks(execute=True):
+        author_client.post(
+            reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,)),
+            data={'text': settings.NEW_COMMENT_TEXT}
+        )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+
+
+@pytest.mark.parametrize(
+    'name', (settings.NEWS_API_DETAIL_NAME, settings.NEWS_API_COMMENTS_NAME)
+)
+def test_api_etag_follows_database_only(name, one_news, one_comment, client):
+    """Проверка ETag по правкам из другого процесса и без кеша процесса."""
+    url = reverse(name, args=(one_news.pk,))
+    etag = client.get(url)['ETag']
+    # Перезапуск процесса с пустым кешем не меняет ETag.
+    cache.clear()
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    # Так выглядят правки, сделанные другим процессом: без сигналов
+    # и без записи в кеш этого процесса.
+    for model, pk in ((News, one_news.pk), (Comment, one_comment.pk)):
+        model.objects.filter(pk=pk).update(
+            text=settings.NEW_COMMENT_TEXT, updated=timezone.now()
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        etag = response['ETag']
+
+
+@pytest.mark.parametrize('engine', ('cached_db', 'signed_cookies'))
+def test_session_profile_skips_session_and_user_queries(
+    engine, one_news, author, client, django_assert_num_queries
+):
+    """Проверка запросов страницы новости в профиле сессий с кешем."""
+    with override_settings(
+        SESSION_ENGINE=f'django.contrib.sessions.backends.{engine}',
+        AUTHENTICATION_BACKENDS=['yanews.auth.CachedModelBackend'],
+    ):
+        client.force_login(author)
+        url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+        client.get(url)
+        # Остаются только новость и страница комментариев.
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert response.context['user'] == author
+        # Изменение пользователя сбрасывает его копию в кеше.
+        author.is_active = False
+        author.save()
+        assert client.get(url).context['user'].is_anonymous
+
+
+@pytest.mark.parametrize('comments_count', (3, 60))
+def test_admin_news_page_is_bounded(
+    comments_count, one_news, author, admin_client
+):
+    """Проверка, что страница новости в админке не растёт с комментариями."""
+    Comment.objects.bulk_create(
+        Comment(news=one_news, author=author, text=settings.COMMENT_TEXT)
+        for _ in range(comments_count)
+    )
+    url = reverse('admin:news_news_change', args=(one_news.pk,))
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    formset = response.context['inline_admin_formsets'][0].formset
+    assert len(formset.forms) == min(comments_count, CommentInline.max_shown)
+    # Сессия, пользователь, новость, комментарии с авторами, SAVEPOINT
+    # и RELEASE, тип содержимого (пока не закеширован); от числа
+    # комментариев не зависит.
+    assert len(queries) <= 7
+
+
+def test_admin_comment_list_filtered_by_news(
+    one_news, a_lot_of_comments, admin_client, django_assert_max_num_queries
+):
+    """Проверка постраничного списка комментариев новости в админке."""
+    url = reverse('admin:news_comment_changelist')
+    with django_assert_max_num_queries(6):
+        response = admin_client.get(url, {'news__id__exact': one_news.pk})
+    assert response.status_code == 200
+    assert response.context['cl'].result_count == settings.COMMENTS_COUNT
+
+
+def test_search_ranks_title_above_text(client):
+    """Проверка, что совпадение в заголовке выше совпадения в тексте."""
+    in_text = News.objects.create(title='Погода', text='Ливни в столице')
+    in_title = News.objects.create(title='Ливни', text='Прогноз')
+    News.objects.create(title='Спорт', text='Матч')
+    response = client.get(reverse(settings.NEWS_SEARCH_NAME), {'q': 'ливн'})
+    assert [news['id'] for news in response.context['results']] == [
+        in_title.pk, in_text.pk
+    ]
+
+
+def test_search_comments_only_on_request(one_comment, client):
+    """Проверка поиска по комментариям только с флагом comments."""
+    url = reverse(settings.NEWS_SEARCH_NAME)
+    query = {'q': settings.COMMENT_TEXT}
+    assert client.get(url, query).context['results'] == []
+    response = client.get(url, {**query, 'comments': '1'})
+    assert [news['id'] for news in response.context['results']] == [
+        one_comment.news_id
+    ]
+
+
+@pytest.mark.parametrize(
+    'cursor', ('abc', '0x1p+0', '0x1p+0_abc', '0x1p+0_99999999999999999999',
+               '0x1p+0_0')
+)
+def test_bad_search_cursor_is_not_found(cursor, client):
+    """Проверка ответа 404 на испорченный курсор поиска."""
+    response = client.get(reverse(settings.NEWS_SEARCH_NAME),
+                          {'q': settings.NEWS_TITLE, 'after': cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_search_keyset_pagination(a_lot_of_news, client):
+    """Проверка постраничной выдачи результатов поиска по курсору."""
+    url = reverse(settings.NEWS_SEARCH_NAME)
+    query = {'q': settings.NEWS_TITLE}
+    shown, cursor = [], None
+    with override_settings(NEWS_SEARCH_PAGE_SIZE=settings.SEARCH_PAGE_SIZE):
+        with CaptureQueriesContext(connection) as queries:
+            while True:
+                response = client.get(url, {**query, 'after': cursor or ''})
+                page = response.context['results']
+                assert len(page) <= settings.SEARCH_PAGE_SIZE
+                shown += [news['id'] for news in page]
+                cursor = response.context['next_cursor']
+                if not cursor:
+                    break
+    assert sorted(shown) == sorted(News.objects.values_list('pk', flat=True))
+    assert not any('OFFSET' in query['sql'] for query in queries)
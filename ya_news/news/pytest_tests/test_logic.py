@@ -1,14 +1,32 @@
+import gzip
+import importlib
+import json
+import random
+import sys
 import pytest
 
 from http import HTTPStatus
+from io import StringIO
 
 from pytest_django.asserts import assertRedirects, assertFormError
 
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connections
+from django.test.utils import override_settings
 from django.urls import reverse
 
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news import ingest
+from news.ingest import CommentQueue, comment_queue
+from news.models import Comment, News
+from news.profanity import BadWordsMatcher
 from news.pytest_tests import settings
+from news.search import search_news
+from news.streaming import iter_json_array
+from news.synthetic import zipf_counts
+import yanews.settings
+import yanews.settings_test
 
 
 def test_anonymous_user_cant_create_comment(
@@ -58,6 +76,22 @@ def test_user_cant_use_bad_words(
     assert Comment.objects.count() == 0
 
 
+@pytest.mark.parametrize(
+    'text, whole_words, expected',
+    (
+        ('Сам ты РЕДИСКА!', False, 'редиска'),
+        ('Вот негодяйка.', False, 'негодяй'),
+        ('Вот негодяйка.', True, None),
+        ('Сам ты, Негодяй', True, 'негодяй'),
+        ('Хорошая новость', False, None),
+    )
+)
+def test_bad_words_matcher(text, whole_words, expected):
+    """Проверка поиска плохих слов без учёта регистра."""
+    matcher = BadWordsMatcher(BAD_WORDS, whole_words=whole_words)
+    assert matcher.search(text) == expected
+
+
 def test_author_can_delete_comment(one_comment, author_client):
     """Проверка удаления комментария автором."""
     delete_url = reverse(settings.NEWS_DELETE_NAME, args=(one_comment.pk,))
@@ -112,3 +146,264 @@ def test_another_user_cant_edit_comment(
     assert one_comment.text == settings.COMMENT_TEXT
     assert one_comment.author == author
     assert one_comment.news == one_news
+
+
+def test_comment_count_follows_create_and_delete(author_client, one_news):
+    """Проверка счётчика комментариев при создании и удалении."""
+    url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+    author_client.post(url, data={'text': settings.COMMENT_TEXT})
+    one_news.refresh_from_db()
+    assert one_news.comment_count == 1
+    comment = Comment.objects.get()
+    author_client.delete(reverse(settings.NEWS_DELETE_NAME,
+                                 args=(comment.pk,)))
+    one_news.refresh_from_db()
+    assert one_news.comment_count == 0
+
+
+def test_news_save_keeps_comment_count(one_news):
+    """Проверка, что сохранение новости не затирает сдвиги счётчика."""
+    stale = News.objects.get(pk=one_news.pk)
+    News.change_comment_count(one_news.pk, 1)
+    News.change_comment_count(one_news.pk, 1)
+    stale.title = settings.NEWS_TITLE + ' исправленная'
+    stale.save()
+    one_news.refresh_from_db()
+    assert one_news.title == stale.title
+    assert one_news.comment_count == 2
+
+
+def test_recount_comments_command(one_news, a_lot_of_comments):
+    """Проверка пересчёта счётчиков командой recount_comments."""
+    call_command('recount_comments', stdout=StringIO())
+    one_news.refresh_from_db()
+    assert one_news.comment_count == settings.COMMENTS_COUNT
+
+
+@pytest.mark.parametrize(
+    'name, args, data, expected_queries',
+    (
+        # Сессия, пользователь, новость, SAVEPOINT, INSERT, UPDATE счётчика,
+        # RELEASE SAVEPOINT.
+        (settings.NEWS_DETAIL_NAME, pytest.lazy_fixture('one_news_pk_for_arg'),
+         {'text': settings.COMMENT_TEXT}, 7),
+        # Сессия, пользователь, комментарий вместе с новостью, UPDATE.
+        (settings.NEWS_EDIT_NAME,
+         pytest.lazy_fixture('one_comment_pk_for_arg'),
+         {'text': settings.NEW_COMMENT_TEXT}, 4),
+        # Сессия, пользователь, комментарий, SAVEPOINT, DELETE,
+        # UPDATE счётчика, RELEASE SAVEPOINT.
+        (settings.NEWS_DELETE_NAME,
+         pytest.lazy_fixture('one_comment_pk_for_arg'), {}, 7),
+    )
+)
+def test_write_views_query_count(
+    name, args, data, expected_queries, one_comment, author_client,
+    django_assert_num_queries
+):
+    """Проверка числа запросов к базе у изменяющих представлений."""
+    url = reverse(name, args=args)
+    with django_assert_num_queries(expected_queries):
+        response = author_client.post(url, data=data)
+    assert response.status_code == HTTPStatus.FOUND
+
+
+@pytest.mark.parametrize('read_size', (1, 7, 4096))
+def test_iter_json_array_matches_json(read_size):
+    """Проверка потокового разбора на любых границах порций."""
+    data = [{'model': 'news.news', 'fields': {'text': 'а, б ] {'}}, [], 1]
+    stream = StringIO(json.dumps(data, indent=2, ensure_ascii=False))
+    assert list(iter_json_array(stream, read_size=read_size)) == data
+
+
+@pytest.mark.parametrize('compress', (False, True))
+def test_load_news_command(tmp_path, author, compress):
+    """Проверка загрузки фикстуры с новостями и комментариями."""
+    fixture = [
+        {'model': 'news.news', 'pk': index + 1,
+         'fields': {'title': f'Новость {index}', 'text': 'Просто текст.',
+                    'date': '2022-11-01'}}
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE)
+    ] + [
+        {'model': 'news.comment',
+         'fields': {'news': 1, 'author': author.pk, 'text': 'Текст',
+                    'created': '2022-11-02T10:00:00Z'}}
+    ]
+    content = json.dumps(fixture).encode()
+    path = tmp_path / 'news.json'
+    path.write_bytes(gzip.compress(content) if compress else content)
+    call_command('load_news', str(path), batch_size=3, stdout=StringIO())
+    assert News.objects.count() == settings.NEWS_COUNT_ON_HOME_PAGE
+    comment = Comment.objects.get()
+    assert comment.created.isoformat() == '2022-11-02T10:00:00+00:00'
+    assert comment.news.comment_count == 1
+
+
+def test_sqlite_pragmas_applied_to_new_connections(settings, db):
+    """Проверка PRAGMA из SQLITE_PRAGMAS на новом соединении."""
+    settings.SQLITE_PRAGMAS = {'synchronous': 'normal', 'cache_size': -1024}
+    connection = connections.create_connection('default')
+    try:
+        with connection.cursor() as cursor:
+            assert cursor.execute('PRAGMA synchronous').fetchone() == (1,)
+            assert cursor.execute('PRAGMA cache_size').fetchone() == (-1024,)
+    finally:
+        connection.close()
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_queued_comments_are_written_in_batch(author_client, one_news):
+    """Проверка отложенной записи комментариев через очередь."""
+    url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+    with override_settings(COMMENT_INGEST_MODE='queue'):
+        for _ in range(settings.COMMENTS_COUNT):
+            response = author_client.post(
+                url, data={'text': settings.COMMENT_TEXT}
+            )
+            assertRedirects(response, f'{url}#comments')
+    # Остановка дописывает очередь и закрывает соединение потока.
+    comment_queue.stop()
+    one_news.refresh_from_db()
+    assert Comment.objects.count() == settings.COMMENTS_COUNT
+    assert one_news.comment_count == settings.COMMENTS_COUNT
+
+
+def test_full_queue_falls_back_to_sync_insert(
+    author_client, one_news, monkeypatch
+):
+    """Проверка записи комментария в запросе, когда очередь полна."""
+    monkeypatch.setattr(comment_queue, 'put', lambda comment: False)
+    url = reverse(settings.NEWS_DETAIL_NAME, args=(one_news.pk,))
+    with override_settings(COMMENT_INGEST_MODE='queue'):
+        author_client.post(url, data={'text': settings.COMMENT_TEXT})
+    one_news.refresh_from_db()
+    assert one_news.comment_count == Comment.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True, serialized_rollback=True)
+def test_failed_batch_is_retried_after_concurrent_write(
+    author, one_news, monkeypatch
+):
+    """Проверка повтора упавшей пачки, пока пишет другой запрос."""
+    removed = News.objects.create(title=settings.NEWS_TITLE)
+    batch = [
+        Comment(news=one_news, author=author, text=settings.COMMENT_TEXT),
+        Comment(news_id=removed.pk, author=author,
+                text=settings.COMMENT_TEXT),
+    ]
+    removed.delete()
+    save_comments = ingest.save_comments
+
+    def save_then_write(comments):
+        try:
+            save_comments(comments)
+        finally:
+            if len(comments) > 1:
+                # Синхронный комментарий занимает id откатившейся пачки.
+                Comment.objects.create(
+                    news=one_news, author=author,
+                    text=settings.NEW_COMMENT_TEXT,
+                )
+
+    monkeypatch.setattr(ingest, 'save_comments', save_then_write)
+    writer = CommentQueue(max_size=len(batch), batch_size=len(batch),
+                          interval=1)
+    for comment in batch:
+        writer._queue.put_nowait(comment)
+    writer._write(batch)
+    assert sorted(
+        Comment.objects.values_list('text', flat=True)
+    ) == sorted((settings.COMMENT_TEXT, settings.NEW_COMMENT_TEXT))
+
+
+def test_comment_queue_is_bounded(monkeypatch):
+    """Проверка, что переполненная очередь отказывает сразу."""
+    bounded = CommentQueue(max_size=1, batch_size=10, interval=1)
+    monkeypatch.setattr(bounded, 'start', lambda: None)
+    assert bounded.put(Comment()) is True
+    assert bounded.put(Comment()) is False
+
+
+def test_search_index_follows_edit_and_delete(one_news):
+    """Проверка, что индекс поиска обновляется при правке и удалении."""
+    assert search_news(settings.NEWS_TITLE)[0]
+    one_news.title = 'Заголовок'
+    one_news.save()
+    assert search_news(settings.NEWS_TITLE)[0] == []
+    assert search_news('заголовок')[0][0]['id'] == one_news.pk
+    one_news.delete()
+    assert search_news('заголовок')[0] == []
+
+
+def test_search_index_covers_bulk_create(a_lot_of_news):
+    """Проверка, что bulk_create тоже попадает в индекс."""
+    results, _ = search_news(settings.NEWS_TITLE, limit=100)
+    assert len(results) == News.objects.count()
+
+
+def test_rebuild_search_command(one_comment):
+    """Проверка пересборки индексов командой rebuild_search."""
+    call_command('rebuild_search', stdout=StringIO())
+    results, _ = search_news(settings.COMMENT_TEXT, with_comments=True)
+    assert [news['id'] for news in results] == [one_comment.news_id]
+
+
+def test_signup_uses_cheap_hasher(client, django_user_model):
+    """Проверка дешёвого хешера паролей в yanews.settings_test."""
+    password = 'Ne-prostoy-parol-42'
+    client.post(reverse(settings.USER_SIGNUP_NAME), data={
+        'username': settings.SIGNUP_USER_NAME,
+        'password1': password,
+        'password2': password,
+    })
+    user = django_user_model.objects.get(username=settings.SIGNUP_USER_NAME)
+    assert user.password.startswith('md5$')
+    assert user.check_password(password)
+
+
+def test_settings_test_refuses_outside_tests(monkeypatch):
+    """Проверка, что тестовые настройки грузятся только в тестах."""
+    # Загрузка модуля меняет имя базы в общем словаре тестовой базы.
+    database = yanews.settings.DATABASES['default']
+    monkeypatch.setitem(database, 'NAME', database['NAME'])
+    for module in ('pytest', 'benchmarks'):
+        monkeypatch.delitem(sys.modules, module, raising=False)
+    monkeypatch.setattr(sys, 'argv', ['manage.py', 'runserver'])
+    with pytest.raises(ImproperlyConfigured):
+        importlib.reload(yanews.settings_test)
+    monkeypatch.setattr(sys, 'argv', ['manage.py', 'test'])
+    importlib.reload(yanews.settings_test)
+
+
+def test_cached_db_sessions_need_shared_cache(monkeypatch):
+    """Проверка отказа от сессий cached_db с кешем в памяти процесса."""
+    with monkeypatch.context() as patch:
+        patch.setenv('YANEWS_SESSIONS', 'cached_db')
+        patch.delenv('YANEWS_CACHE', raising=False)
+        with pytest.raises(ImproperlyConfigured):
+            importlib.reload(yanews.settings)
+        patch.setenv('YANEWS_CACHE', 'file')
+        importlib.reload(yanews.settings)
+    importlib.reload(yanews.settings)
+
+
+def test_zipf_counts_are_deterministic_and_skewed():
+    """Проверка раскладки по Ципфу: сумма, повторяемость и перекос."""
+    counts = zipf_counts(1000, 50, 1.1, random.Random(1))
+    assert sum(counts) == 1000
+    assert counts == zipf_counts(1000, 50, 1.1, random.Random(1))
+    assert max(counts) > 10 * min(counts)
+
+
+def test_generate_news_command():
+    """Проверка генерации новостей с согласованными счётчиками."""
+    call_command(
+        'generate_news', news=settings.NEWS_COUNT_ON_HOME_PAGE,
+        comments=settings.COMMENTS_COUNT * 10, users=3, seed=1,
+        stdout=StringIO(),
+    )
+    assert News.objects.count() == settings.NEWS_COUNT_ON_HOME_PAGE
+    assert Comment.objects.count() == settings.COMMENTS_COUNT * 10
+    counts = dict(News.objects.values_list('pk', 'comment_count'))
+    News.recount_comments()
+    assert dict(News.objects.values_list('pk', 'comment_count')) == counts
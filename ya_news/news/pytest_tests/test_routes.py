@@ -13,7 +13,18 @@ from news.pytest_tests import settings
     (
         (settings.NEWS_DETAIL_NAME,
          pytest.lazy_fixture('one_news_pk_for_arg')),
+        (settings.NEWS_COMMENTS_NAME,
+         pytest.lazy_fixture('one_news_pk_for_arg')),
         (settings.NEWS_HOME_NAME, None),
+        (settings.NEWS_DETAIL_ASYNC_NAME,
+         pytest.lazy_fixture('one_news_pk_for_arg')),
+        (settings.NEWS_HOME_ASYNC_NAME, None),
+        (settings.NEWS_SEARCH_NAME, None),
+        (settings.NEWS_API_LIST_NAME, None),
+        (settings.NEWS_API_DETAIL_NAME,
+         pytest.lazy_fixture('one_news_pk_for_arg')),
+        (settings.NEWS_API_COMMENTS_NAME,
+         pytest.lazy_fixture('one_news_pk_for_arg')),
         (settings.USER_LOGIN_NAME, None),
         (settings.USER_LOGOUT_NAME, None),
         (settings.USER_SIGNUP_NAME, None),
@@ -62,3 +73,17 @@ def test_redirect_for_anonymous_client(
     expected_url = f'{login_url}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.parametrize(
+    'parametrized_client, expected_status',
+    (
+        (pytest.lazy_fixture('client'), HTTPStatus.FOUND),
+        (pytest.lazy_fixture('author_client'), HTTPStatus.FOUND),
+        (pytest.lazy_fixture('admin_client'), HTTPStatus.OK),
+    ),
+)
+def test_request_stats_only_for_staff(parametrized_client, expected_status):
+    """Проверка, что сводка замеров запросов доступна только персоналу."""
+    response = parametrized_client.get(reverse(settings.REQUEST_STATS_NAME))
+    assert response.status_code == expected_status
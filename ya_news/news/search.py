@@ -0,0 +1,107 @@
+"""Полнотекстовый поиск по новостям и, по желанию, их комментариям.
+
+Индексы news_news_fts и news_comment_fts (FTS5, миграция 0004_search)
+обновляются триггерами при каждой записи в таблицы новостей и
+комментариев. Пересобрать их целиком можно командой rebuild_search.
+
+Результаты упорядочены по bm25 (меньше — лучше), а страницы выбираются
+по курсору из пары (оценка, id) последней показанной новости, как и
+лента комментариев в news/pagination.py.
+"""
+import re
+
+from django.db import connection
+from django.http import Http404
+
+from .models import News
+from .pagination import MAX_ID
+
+WORD = re.compile(r'\w+')
+TITLE_WEIGHT, TEXT_WEIGHT = 10.0, 1.0
+# Совпадение в комментарии весит меньше совпадения в самой новости.
+COMMENT_WEIGHT = 0.5
+
+NEWS_HITS_SQL = f"""
+    SELECT rowid AS news_id,
+           bm25(news_news_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}) AS score
+    FROM news_news_fts WHERE news_news_fts MATCH %s
+"""
+COMMENT_HITS_SQL = f"""
+    SELECT comment.news_id,
+           bm25(news_comment_fts) * {COMMENT_WEIGHT} AS score
+    FROM news_comment_fts
+    JOIN news_comment AS comment ON comment.id = news_comment_fts.rowid
+    WHERE news_comment_fts MATCH %s
+"""
+
+
+def match_expression(query):
+    """Все слова запроса как префиксы; операторы FTS5 отбрасываются."""
+    words = WORD.findall(query)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def encode_cursor(score, pk):
+    """Кодирует позицию результата без потери точности оценки."""
+    return f'{score.hex()}_{pk}'
+
+
+def decode_cursor(cursor):
+    try:
+        score, pk = cursor.rsplit('_', 1)
+        score, pk = float.fromhex(score), int(pk)
+    except (ValueError, OverflowError):
+        raise Http404('Некорректный курсор.')
+    if not 0 < pk <= MAX_ID:
+        raise Http404('Некорректный курсор.')
+    return score, pk
+
+
+def ranked_ids(expression, cursor, with_comments, limit):
+    """Пары (id новости, оценка) очередной страницы."""
+    hits, params = NEWS_HITS_SQL, [expression]
+    if with_comments:
+        hits += ' UNION ALL ' + COMMENT_HITS_SQL
+        params.append(expression)
+    # Без MATERIALIZED SQLite встраивает подзапрос в группировку,
+    # а bm25() вне запроса к самому индексу не работает.
+    sql = (
+        f'WITH hits AS MATERIALIZED ({hits}) '
+        'SELECT news_id, MIN(score) AS score FROM hits GROUP BY news_id'
+    )
+    if cursor:
+        score, pk = decode_cursor(cursor)
+        sql += (
+            ' HAVING MIN(score) > %s'
+            ' OR (MIN(score) = %s AND news_id > %s)'
+        )
+        params += [score, score, pk]
+    sql += ' ORDER BY score, news_id LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        return db_cursor.fetchall()
+
+
+def search_news(query, cursor=None, with_comments=False, limit=20):
+    """Новости по запросу, лучшие первыми, и курсор следующей страницы.
+
+    Новости возвращаются словарями из values() в порядке ранжирования.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return [], None
+    ranked = ranked_ids(expression, cursor, with_comments, limit + 1)
+    page = ranked[:limit]
+    news = {
+        item['id']: item
+        for item in News.objects.filter(
+            pk__in=[pk for pk, _ in page]
+        ).order_by().values('id', 'title', 'date', 'comment_count')
+    }
+    next_cursor = None
+    if len(ranked) > limit:
+        next_cursor = encode_cursor(page[-1][1], page[-1][0])
+    return [news[pk] for pk, _ in page if pk in news], next_cursor
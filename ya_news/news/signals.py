@@ -0,0 +1,24 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .fragments import bump_version
+from .models import Comment, News
+
+
+@receiver((post_save, post_delete), sender=News)
+def news_changed(sender, instance, **kwargs):
+    """Сбрасывает карточку новости после её изменения."""
+    transaction.on_commit(partial(bump_version, instance.pk))
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    """Сбрасывает карточку новости после изменения её комментариев.
+
+    Версия меняется только после фиксации транзакции, когда новый
+    счётчик комментариев уже виден другим запросам.
+    """
+    transaction.on_commit(partial(bump_version, instance.news_id))
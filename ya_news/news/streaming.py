@@ -0,0 +1,104 @@
+"""Потоковое чтение фикстур в формате loaddata.
+
+Фикстура — JSON-массив объектов. Объекты разбираются по одному по мере
+чтения файла, поэтому память не зависит от размера фикстуры.
+Объекты затем пишутся пачками через bulk_create, который сохраняет даты
+из фикстуры только внутри keep_fixture_dates.
+"""
+import gzip
+import json
+from contextlib import contextmanager
+
+GZIP_MAGIC = b'\x1f\x8b'
+READ_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+
+
+@contextmanager
+def keep_fixture_dates(model):
+    """Не даёт bulk_create перезаписать даты auto_now_add из фикстуры.
+
+    loaddata сохраняет объекты в raw-режиме, где такие поля не трогаются;
+    bulk_create этого режима не знает.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def open_fixture(path):
+    """Открывает фикстуру на чтение текста, распознавая gzip по сигнатуре."""
+    with open(path, 'rb') as file:
+        compressed = file.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    if compressed:
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+class _Reader:
+    """Буфер поверх потока, который дочитывается по требованию."""
+
+    def __init__(self, stream, read_size):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ''
+        self.position = 0
+
+    def read_more(self):
+        """Дочитывает порцию, отбрасывая уже разобранное начало буфера."""
+        chunk = self.stream.read(self.read_size)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return bool(chunk)
+
+    def next_char(self):
+        """Первый значимый символ после пробелов, без его потребления."""
+        while True:
+            while (
+                self.position < len(self.buffer)
+                and self.buffer[self.position] in WHITESPACE
+            ):
+                self.position += 1
+            if self.position < len(self.buffer):
+                return self.buffer[self.position]
+            if not self.read_more():
+                raise ValueError('Фикстура неожиданно закончилась.')
+
+    def expect(self, chars):
+        char = self.next_char()
+        if char not in chars:
+            raise ValueError(
+                f'Ожидался один из символов {chars!r}, найден {char!r}.'
+            )
+        self.position += 1
+        return char
+
+
+def iter_json_array(stream, read_size=READ_SIZE):
+    """Элементы JSON-массива верхнего уровня по одному."""
+    decoder = json.JSONDecoder()
+    reader = _Reader(stream, read_size)
+    reader.expect('[')
+    if reader.next_char() == ']':
+        return
+    while True:
+        reader.next_char()
+        try:
+            item, end = decoder.raw_decode(reader.buffer, reader.position)
+        except json.JSONDecodeError:
+            # Объект оборван на границе порции: дочитываем и пробуем снова.
+            if not reader.read_more():
+                raise
+            continue
+        yield item
+        reader.position = end
+        if reader.expect(',]') == ']':
+            return
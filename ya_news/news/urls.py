@@ -1,16 +1,35 @@
 from django.urls import path
 
-from news import views
+from news import api, views
 
 app_name = 'news'
 
 urlpatterns = [
     path('', views.NewsList.as_view(), name='home'),
     path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path(
+        'news/<int:pk>/comments/',
+        views.NewsComments.as_view(),
+        name='comments'
+    ),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('async/', views.NewsListAsync.as_view(), name='home_async'),
+    path(
+        'async/news/<int:pk>/',
+        views.NewsDetailAsync.as_view(),
+        name='detail_async'
+    ),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('api/news/', api.news_list, name='api_list'),
+    path('api/news/<int:pk>/', api.news_detail, name='api_detail'),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.news_comments,
+        name='api_comments'
+    ),
 ]
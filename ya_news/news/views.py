@@ -1,12 +1,19 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import logout
-from django.shortcuts import get_object_or_404, render
+from django.db import transaction
+from django.http import HttpResponseRedirect
+from django.shortcuts import aget_object_or_404, render
+from django.template.response import TemplateResponse
 from django.urls import reverse
 from django.views import generic
 
 from .forms import CommentForm
+from .fragments import arender_cards, render_cards
+from .ingest import comment_queue
 from .models import Comment, News
+from .pagination import acomments_page, comments_page
+from .search import search_news
 
 
 def user_logout(request):
@@ -24,22 +31,40 @@ class NewsList(generic.ListView):
         Выводим только несколько последних новостей.
 
         Их количество определяется в настройках проекта.
+        Число комментариев хранится в самой новости, поэтому
+        сами комментарии здесь не загружаются.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
 
+    def get_context_data(self, **kwargs):
+        """
+        Карточки новостей берутся из кеша.
 
-class NewsDetail(generic.DetailView):
-    model = News
-    template_name = 'news/detail.html'
+        Запрос к базе за самими новостями выполняется только для тех,
+        что изменились с прошлой отрисовки.
+        """
+        context = super().get_context_data(**kwargs)
+        context['news_cards'] = render_cards(
+            list(self.object_list.values_list('pk', flat=True))
+        )
+        return context
+
+
+class CommentsPageMixin:
+    """Добавляет в контекст первую страницу комментариев новости."""
 
-    def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = comments_page(
+            self.object.pk
         )
-        return obj
+        context['news_id'] = self.object.pk
+        return context
+
+
+class NewsDetail(CommentsPageMixin, generic.DetailView):
+    model = News
+    template_name = 'news/detail.html'
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -50,6 +75,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentsPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -65,12 +91,49 @@ class NewsComment(
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
-        comment.save()
+        if (
+            settings.COMMENT_INGEST_MODE == 'queue'
+            and comment_queue.put(comment)
+        ):
+            return HttpResponseRedirect(self.get_success_url())
+        with transaction.atomic():
+            comment.save()
+            News.change_comment_count(comment.news_id, 1)
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
+
+
+class NewsComments(generic.TemplateView):
+    """Следующая страница комментариев для кнопки «Показать ещё»."""
+    template_name = 'includes/comments.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor'] = self.request.GET.get('after')
+        context['comments'], context['next_cursor'] = comments_page(
+            self.kwargs['pk'], context['cursor']
+        )
+        context['news_id'] = self.kwargs['pk']
+        return context
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по новостям и их комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        context['with_comments'] = bool(self.request.GET.get('comments'))
+        context['results'], context['next_cursor'] = search_news(
+            context['query'], self.request.GET.get('after'),
+            context['with_comments'], settings.NEWS_SEARCH_PAGE_SIZE
+        )
+        return context
 
 
 class NewsDetailView(generic.View):
@@ -84,19 +147,58 @@ class NewsDetailView(generic.View):
         return view(request, *args, **kwargs)
 
 
+class NewsListAsync(generic.View):
+    """Асинхронный вариант NewsList для работы под ASGI."""
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        pks = [
+            pk async for pk in News.objects.values_list(
+                'pk', flat=True
+            )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        ]
+        return TemplateResponse(request, 'news/home.html', {
+            'news_cards': await arender_cards(pks),
+        })
+
+
+class NewsDetailAsync(generic.View):
+    """Асинхронный вариант NewsDetail для работы под ASGI.
+
+    Форма комментария отправляется на синхронный адрес новости.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        news = await aget_object_or_404(News, pk=kwargs['pk'])
+        comments, next_cursor = await acomments_page(news.pk)
+        context = {
+            'news': news,
+            'object': news,
+            'comments': comments,
+            'next_cursor': next_cursor,
+            'news_id': news.pk,
+        }
+        if request.user.is_authenticated:
+            context['form'] = CommentForm()
+        return TemplateResponse(request, 'news/detail.html', context)
+
+
 class CommentBase(LoginRequiredMixin):
     """Базовый класс для работы с комментариями."""
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Адрес строится по news_id уже загруженного комментария."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -108,3 +210,18 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        return self.delete_comment()
+
+    def form_valid(self, form):
+        return self.delete_comment()
+
+    def delete_comment(self):
+        """Удаляет комментарий вместе с уменьшением счётчика новости."""
+        success_url = self.get_success_url()
+        with transaction.atomic():
+            self.object.delete()
+            News.change_comment_count(self.object.news_id, -1)
+        return HttpResponseRedirect(success_url)
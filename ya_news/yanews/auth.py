@@ -0,0 +1,36 @@
+"""Загрузка пользователя сессии через кеш.
+
+CachedModelBackend хранит пользователя в кеше по id, поэтому запрос
+с авторизованной сессией не обращается к таблице пользователей. Запись
+сбрасывается функцией forget_user при сохранении или удалении
+пользователя, но только в кеше того процесса, где пользователь изменён.
+
+С кешем в памяти процесса (locmem) остальные процессы сервера хранят
+старую копию до истечения USER_CACHE_TIMEOUT: всё это время они видят
+заблокированного пользователя активным и принимают сессии, созданные
+до смены пароля. Поэтому с locmem срок в настройках короткий, а сразу
+изменения видны только с общим для процессов кешем.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_KEY = 'auth:user:{pk}'
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кеша."""
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(pk=user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+
+
+def forget_user(sender, instance, **kwargs):
+    """Удаляет пользователя из кеша после его изменения."""
+    cache.delete(USER_KEY.format(pk=instance.pk))
@@ -0,0 +1,210 @@
+"""Учёт запросов к базе и времени ответа по именам адресов.
+
+RequestBudgetMiddleware замеряет для каждого запроса число SQL-запросов,
+время в базе, время отрисовки шаблона и полное время ответа. Замеры
+копятся в скользящем окне по имени адреса (например, ``news:detail``),
+а превышение бюджета из настроек REQUEST_BUDGETS пишется в лог.
+Процентили по окну отдаёт представление request_stats (только персоналу).
+
+SQL-запросы считает одна обёртка record_query, подключённая к каждому
+соединению при его создании. Замер текущего запроса она берёт из
+contextvars: под ASGI конкурентные запросы выполняют ORM в одном общем
+потоке и на одном соединении, и только контекст отличает их друг от
+друга.
+"""
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('queries', 'sql_ms', 'template_ms', 'wall_ms')
+PERCENTILES = (50, 95, 99)
+
+# Замер запроса, который сейчас обрабатывается в этом контексте.
+current_sample = ContextVar('current_sample', default=None)
+
+
+class RequestSample:
+    """Замеры одного запроса."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.wall_ms = 0.0
+        self._render_started = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """Выполняет SQL-запрос, учитывая его в замере."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_ms += (time.perf_counter() - started) * 1000
+
+    def start_render(self):
+        self._render_started = time.perf_counter()
+
+    def finish_render(self, response):
+        self.template_ms += (
+            time.perf_counter() - self._render_started
+        ) * 1000
+
+    def as_dict(self):
+        return {metric: getattr(self, metric) for metric in METRICS}
+
+
+def percentile(values, percent):
+    """Процентиль по методу ближайшего ранга; values отсортированы."""
+    rank = max(math.ceil(percent / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+class RequestStats:
+    """Скользящее окно последних замеров по каждому имени адреса."""
+
+    def __init__(self, window):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def add(self, url_name, sample):
+        with self._lock:
+            self._samples[url_name].append(sample.as_dict())
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+    def report(self):
+        """Число замеров и процентили каждой метрики по адресам."""
+        with self._lock:
+            snapshot = {
+                url_name: list(samples)
+                for url_name, samples in self._samples.items()
+            }
+        report = {}
+        for url_name, samples in snapshot.items():
+            report[url_name] = {'count': len(samples)}
+            for metric in METRICS:
+                values = sorted(sample[metric] for sample in samples)
+                report[url_name][metric] = {
+                    f'p{percent}': round(percentile(values, percent), 3)
+                    for percent in PERCENTILES
+                }
+        return report
+
+
+stats = RequestStats(settings.REQUEST_STATS_WINDOW)
+
+
+def exceeded_budget(url_name, sample):
+    """Метрики запроса, вышедшие за бюджет адреса."""
+    budget = settings.REQUEST_BUDGETS.get(
+        url_name, settings.REQUEST_BUDGET_DEFAULT
+    )
+    return {
+        metric: (getattr(sample, metric), limit)
+        for metric, limit in budget.items()
+        if getattr(sample, metric) > limit
+    }
+
+
+def record_query(execute, sql, params, many, context):
+    """Обёртка соединения: учитывает SQL в замере текущего запроса."""
+    sample = current_sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    return sample.record_query(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """Подключает record_query к соединению при его создании.
+
+    Обработчик сигнала connection_created. Объект соединения
+    переживает переподключения, поэтому обёртка добавляется один раз.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestBudgetMiddleware:
+    """Замеряет запрос и сверяет его с бюджетом адреса.
+
+    Работает и под ASGI, не переводя асинхронные представления в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sample = request.request_sample = RequestSample()
+        started = time.perf_counter()
+        token = current_sample.set(sample)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        self.finish(request, sample, started)
+        return response
+
+    async def __acall__(self, request):
+        # sync_to_async переносит контекст в поток ORM, поэтому запросы
+        # к базе попадают в замер своего запроса.
+        sample = request.request_sample = RequestSample()
+        started = time.perf_counter()
+        token = current_sample.set(sample)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_sample.reset(token)
+        self.finish(request, sample, started)
+        return response
+
+    def finish(self, request, sample, started):
+        sample.wall_ms = (time.perf_counter() - started) * 1000
+        if request.resolver_match is not None:
+            self.record(request.resolver_match.view_name, sample)
+
+    def process_template_response(self, request, response):
+        # Шаблон отрисовывается сразу после этого метода.
+        request.request_sample.start_render()
+        response.add_post_render_callback(
+            request.request_sample.finish_render
+        )
+        return response
+
+    def record(self, url_name, sample):
+        stats.add(url_name, sample)
+        exceeded = exceeded_budget(url_name, sample)
+        if exceeded:
+            logger.warning(
+                'Запрос к %s превысил бюджет: %s', url_name,
+                ', '.join(
+                    f'{metric}={value:g} (лимит {limit:g})'
+                    for metric, (value, limit) in exceeded.items()
+                )
+            )
+
+
+@staff_member_required
+def request_stats(request):
+    """Процентили замеров по адресам в JSON."""
+    return JsonResponse(stats.report(), json_dumps_params={
+        'ensure_ascii': False
+    })
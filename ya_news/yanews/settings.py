@@ -1,5 +1,7 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.urls import reverse_lazy
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanews.metrics.RequestBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,13 +54,64 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
+DATABASE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Секунды ожидания блокировки вместо «database is locked».
+            'timeout': 5,
+            # Пишущие транзакции сразу берут блокировку записи и ждут её,
+            # а не падают при попытке повысить блокировку чтения.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+# YANEWS_DB=tuned включает профиль для конкурентной нагрузки: постоянные
+# соединения и PRAGMA из SQLITE_PRAGMAS (см. yanews/db.py).
+DATABASE_PROFILE = os.getenv('YANEWS_DB', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **DATABASE_PROFILES[DATABASE_PROFILE],
     }
 }
 
+SQLITE_PRAGMAS = {
+    # Читатели не блокируют писателя и наоборот.
+    'journal_mode': 'wal',
+    # В режиме WAL fsync нужен только при контрольной точке.
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    # Отрицательное значение — размер кеша страниц в КиБ.
+    'cache_size': -64 * 2 ** 10,
+    'busy_timeout': 5000,
+} if DATABASE_PROFILE == 'tuned' else {}
+
+
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanews',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+# Кеш в памяти процесса по умолчанию; YANEWS_CACHE=file включает файловый
+# кеш, общий для всех процессов сервера.
+CACHES = {
+    'default': CACHE_BACKENDS[os.getenv('YANEWS_CACHE', 'locmem')],
+}
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -76,7 +130,72 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    # Выход удаляет сессию из базы и из кеша только своего процесса.
+    # С кешем в памяти процесса другие процессы сервера пускали бы по ней
+    # до SESSION_COOKIE_AGE, поэтому профиль требует общего кеша
+    # YANEWS_CACHE=file.
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    # Данные сессии хранятся в подписанной cookie у клиента, поэтому
+    # выход на одном устройстве не завершает скопированную сессию.
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+# YANEWS_SESSIONS=cached_db или signed_cookies убирает запрос к таблице
+# сессий и подключает загрузку пользователя через кеш (yanews/auth.py).
+SESSION_PROFILE = os.getenv('YANEWS_SESSIONS', 'db')
+
+if (
+    SESSION_PROFILE == 'cached_db'
+    and CACHES['default'] is CACHE_BACKENDS['locmem']
+):
+    raise ImproperlyConfigured(
+        'YANEWS_SESSIONS=cached_db работает только с общим кешем '
+        'YANEWS_CACHE=file.'
+    )
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend'
+    if SESSION_PROFILE == 'db' else 'yanews.auth.CachedModelBackend'
+]
+
+# forget_user сбрасывает копию пользователя только в кеше своего процесса.
+# С кешем в памяти процесса другие процессы сервера держат старую копию
+# до истечения срока (см. yanews/auth.py), поэтому он короткий; пять
+# минут — только с общим кешем YANEWS_CACHE=file.
+USER_CACHE_TIMEOUT = (
+    10 if CACHES['default'] is CACHE_BACKENDS['locmem'] else 5 * 60
+)
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+NEWS_CARD_CACHE_TIMEOUT = 60 * 60
+
+COMMENTS_PAGE_SIZE = 20
+
+NEWS_SEARCH_PAGE_SIZE = 20
+
+# YANEWS_COMMENT_INGEST=queue включает отложенную запись комментариев
+# пачками из фонового потока, см. news/ingest.py.
+COMMENT_INGEST_MODE = os.getenv('YANEWS_COMMENT_INGEST', 'sync')
+COMMENT_QUEUE_SIZE = 1000
+COMMENT_BATCH_SIZE = 100
+COMMENT_FLUSH_INTERVAL = 0.2
+
+# Бюджеты запросов по именам адресов, см. yanews/metrics.py.
+# Метрики: queries, sql_ms, template_ms, wall_ms.
+REQUEST_STATS_WINDOW = 1000
+REQUEST_BUDGET_DEFAULT = {'queries': 10, 'sql_ms': 100, 'wall_ms': 500}
+REQUEST_BUDGETS = {
+    'news:home': {'queries': 4, 'wall_ms': 200},
+    'news:detail': {'queries': 8, 'wall_ms': 300},
+    'news:home_async': {'queries': 4, 'wall_ms': 200},
+    'news:detail_async': {'queries': 8, 'wall_ms': 300},
+    'news:search': {'queries': 4, 'wall_ms': 200},
+}
@@ -6,11 +6,13 @@ from django.views.generic import CreateView
 
 
 from news.views import user_logout
+from yanews.metrics import request_stats
 
 
 urlpatterns = [
     path('', include('news.urls')),
     path('admin/', admin.site.urls),
+    path('metrics/', request_stats, name='request_stats'),
 ]
 
 auth_urls = ([
@@ -0,0 +1,39 @@
+"""Замеры производительности проекта YaNote.
+
+Замеры запускаются из каталога ya_note как модули пакета, например::
+
+    python -m benchmarks.slugs
+
+Импорт пакета настраивает Django с настройками yanote.settings_test,
+поэтому модули проекта в замерах можно импортировать сразу.
+"""
+import os
+import tempfile
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings_test')
+django.setup()
+
+from django.db import connection  # noqa: E402
+
+
+@contextmanager
+def test_database():
+    """Временная файловая база с применёнными миграциями.
+
+    База файловая, а не в памяти, чтобы потоки замера работали с ней
+    через собственные соединения.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        connection.settings_dict['TEST']['NAME'] = os.path.join(
+            directory, 'benchmark.sqlite3'
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            yield
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
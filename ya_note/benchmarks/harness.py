@@ -0,0 +1,140 @@
+"""Прогон сценариев горячих путей и сравнение с сохранённым отчётом.
+
+Сценарий — имя, ожидаемый код ответа и функция send(index), которая
+делает один запрос через тестовый клиент. Для каждого сценария
+считаются запросы в секунду, задержки p50/p95/p99, среднее число
+SQL-запросов на запрос и пиковый RSS процесса к концу сценария. Отчёт —
+JSON, который можно сохранить и передать следующему прогону в
+--baseline: тогда ухудшения сверх --tolerance печатаются, а код выхода
+становится 1.
+
+Модуль одинаков в обоих проектах, кроме импорта metrics.
+"""
+import argparse
+import json
+import logging
+import resource
+import sys
+import time
+
+from django.conf import settings
+from django.db import connection
+
+from benchmarks import test_database
+from yanote import metrics
+
+# Первые запросы компилируют шаблоны и прогревают кеши и в замер
+# не входят.
+WARMUP = 10
+PERCENTILES = (50, 95, 99)
+# Метрики, рост которых — регрессия; для rps регрессия — падение.
+HIGHER_IS_WORSE = ('p50_ms', 'p95_ms', 'p99_ms', 'peak_rss_kb')
+
+
+class QueryCounter:
+    """Обёртка execute_wrapper, считающая SQL-запросы."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run_scenario(send, status, requests):
+    """Прогоняет сценарий и возвращает его метрики."""
+    for index in range(WARMUP):
+        send(index)
+    counter = QueryCounter()
+    latencies = []
+    with connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        for index in range(WARMUP, WARMUP + requests):
+            request_started = time.perf_counter()
+            response = send(index)
+            latencies.append(time.perf_counter() - request_started)
+            assert response.status_code == status, response.status_code
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    result = {
+        'requests': requests,
+        'rps': requests / elapsed,
+        'queries': counter.count / requests,
+    }
+    for percent in PERCENTILES:
+        latency = metrics.percentile(latencies, percent)
+        result[f'p{percent}_ms'] = latency * 1000
+    # На Linux ru_maxrss в килобайтах.
+    result['peak_rss_kb'] = resource.getrusage(
+        resource.RUSAGE_SELF
+    ).ru_maxrss
+    return result
+
+
+def compare(report, baseline, tolerance):
+    """Строки с ухудшениями report относительно baseline."""
+    regressions = []
+    for name, result in report['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            continue
+        worse = [
+            (metric, result[metric] > base[metric] * (1 + tolerance))
+            for metric in HIGHER_IS_WORSE
+        ] + [
+            ('rps', result['rps'] < base['rps'] * (1 - tolerance)),
+            # Лишний SQL-запрос — регрессия при любом допуске.
+            ('queries', result['queries'] > base['queries']),
+        ]
+        regressions += [
+            f'{name}: {metric} {base[metric]:.2f} -> {result[metric]:.2f}'
+            for metric, is_worse in worse if is_worse
+        ]
+    return regressions
+
+
+def main(description, add_arguments, seed):
+    """Разбирает аргументы, наполняет базу и прогоняет сценарии.
+
+    add_arguments(parser) добавляет параметры масштаба, seed(args)
+    наполняет временную базу и возвращает список сценариев
+    (имя, код ответа, send), рассчитанный на WARMUP + --requests
+    запросов каждый.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    add_arguments(parser)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--output', help='Куда сохранить отчёт JSON.')
+    parser.add_argument('--baseline', help='Отчёт JSON для сравнения.')
+    parser.add_argument('--tolerance', type=float, default=0.15)
+    args = parser.parse_args()
+    # При DEBUG соединение копит текст всех запросов.
+    settings.DEBUG = False
+    # Предупреждения о превышении бюджетов запросов не нужны в отчёте.
+    logging.getLogger(metrics.__name__).setLevel(logging.ERROR)
+    report = {'scale': {
+        key: value for key, value in vars(args).items()
+        if key not in ('output', 'baseline', 'tolerance')
+    }, 'scenarios': {}}
+    with test_database():
+        for name, status, send in seed(args):
+            report['scenarios'][name] = run_scenario(
+                send, status, args.requests
+            )
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(output + '\n')
+    print(output)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        if baseline['scale'] != report['scale']:
+            print('Масштаб прогона отличается от сохранённого отчёта.',
+                  file=sys.stderr)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f'Регрессия {line}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
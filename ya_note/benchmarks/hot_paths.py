@@ -0,0 +1,63 @@
+"""Горячие пути YaNote: список, заметка и добавление заметки.
+
+Запуск: python -m benchmarks.hot_paths [--users 10] [--notes 100]
+        [--requests 200] [--output report.json] [--baseline old.json]
+
+Во временной базе создаётся --users пользователей по --notes заметок,
+после чего тестовый клиент первого пользователя прогоняет сценарии
+notes:list, notes:detail и notes:add. Отчёт и сравнение с --baseline
+описаны в benchmarks/harness.py.
+"""
+from django.contrib.auth import get_user_model
+from django.test import Client
+from django.urls import reverse
+
+from benchmarks import harness
+from notes.models import Note
+
+
+def add_arguments(parser):
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--notes', type=int, default=100,
+                        help='Заметок на пользователя.')
+
+
+def seed(args):
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f'user{index}')
+        for index in range(args.users)
+    )
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст заметки',
+             slug=f'note-{user.pk}-{index}', author=user)
+        for user in users for index in range(args.notes)
+    )
+    client = Client()
+    client.force_login(users[0])
+    list_url = reverse('notes:list')
+    add_url = reverse('notes:add')
+    detail_urls = [
+        reverse('notes:detail', args=(f'note-{users[0].pk}-{index}',))
+        for index in range(args.notes)
+    ]
+
+    def notes_list(index):
+        return client.get(list_url)
+
+    def detail(index):
+        return client.get(detail_urls[index % len(detail_urls)])
+
+    def add(index):
+        return client.post(add_url, data={
+            'title': f'Новая заметка {index}', 'text': 'Текст заметки',
+        })
+
+    return [
+        ('notes:list', 200, notes_list),
+        ('notes:detail', 200, detail),
+        ('notes:add', 302, add),
+    ]
+
+
+if __name__ == '__main__':
+    harness.main(__doc__, add_arguments, seed)
@@ -0,0 +1,110 @@
+"""Полнотекстовый поиск по заметкам против LIKE на большом объёме.
+
+Запуск: python -m benchmarks.search [--notes 1000000] [--authors 100]
+
+Заметки из случайных «кириллических» слов с перекосом к популярным
+вставляются во временную базу (индекс FTS5 заполняют триггеры). Затем
+для одного автора сравниваются search_notes, LIKE по заметкам автора
+и LIKE по всей таблице на запросах разной частоты.
+
+FTS5 ранжирует все совпадения автора, поэтому слово, которое есть почти
+в каждой заметке, стоит заметно дороже редкого: LIKE с LIMIT находит
+первые 20 таких заметок сразу, но без ранжирования.
+"""
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+
+from benchmarks import test_database
+from notes.models import Note
+from notes.search import search_notes
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+VOCABULARY = 50_000
+WORDS_PER_NOTE = 30
+BATCH = 10_000
+
+
+def fill(notes, authors, rng):
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f'Автор {index}')
+        for index in range(authors)
+    )
+    words = [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(4, 10)))
+        for _ in range(VOCABULARY)
+    ]
+    # Частота слова обратно пропорциональна его рангу (закон Ципфа).
+    cum_weights = list(itertools.accumulate(
+        1 / rank for rank in range(1, VOCABULARY + 1)
+    ))
+    started = time.perf_counter()
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, notes, BATCH):
+            rows = []
+            for index in range(start, min(start + BATCH, notes)):
+                text = rng.choices(
+                    words, cum_weights=cum_weights, k=WORDS_PER_NOTE
+                )
+                rows.append((
+                    ' '.join(text[:4]).capitalize(), ' '.join(text),
+                    f'note-{index}', users[index % authors].pk,
+                ))
+            cursor.executemany(
+                'INSERT INTO notes_note (title, text, slug, author_id) '
+                'VALUES (%s, %s, %s, %s)', rows
+            )
+    print(f'Вставлено {notes} заметок за '
+          f'{time.perf_counter() - started:.0f} с')
+    return users[0], words
+
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--authors', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    with test_database():
+        author, words = fill(args.notes, args.authors, rng)
+        queries = {
+            'редкое слово': words[VOCABULARY // 2],
+            'обычное слово': words[300],
+            # Самое частое слово есть почти в каждой заметке, как «и».
+            'самое частое слово': words[0],
+            'два частых слова': f'{words[1]} {words[50]}',
+        }
+        for label, query in queries.items():
+            like = Q()
+            for word in query.split():
+                like &= Q(title__icontains=word) | Q(text__icontains=word)
+            results = {
+                'FTS5': lambda: search_notes(author, query, 20),
+                'LIKE автора': lambda: list(
+                    Note.objects.filter(like, author=author)[:20]
+                ),
+                'LIKE всех': lambda: list(Note.objects.filter(like)[:20]),
+            }
+            print(f'{label} «{query}»:')
+            for name, function in results.items():
+                print(f'  {name:<12} {timed(function, args.repeat):9.2f} мс')
+
+
+if __name__ == '__main__':
+    main()
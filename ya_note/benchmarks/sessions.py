@@ -0,0 +1,73 @@
+"""Запросы к базе на странице notes:list в разных профилях сессий.
+
+Запуск: python -m benchmarks.sessions [--requests 200]
+
+Для каждого профиля YANOTE_SESSIONS (db, signed_cookies)
+запускается отдельный процесс. Авторизованный клиент открывает список
+заметок; печатается среднее число SQL-запросов и время ответа.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from benchmarks import test_database
+from notes.models import Note
+
+PROFILES = ('db', 'signed_cookies')
+NOTES_COUNT = 20
+
+
+def child(requests):
+    """Замер в дочернем процессе с профилем из окружения."""
+    with test_database():
+        author = get_user_model().objects.create(username='Автор')
+        for index in range(NOTES_COUNT):
+            Note.objects.create(title=f'Заметка {index}', text='Текст',
+                                author=author)
+        client = Client()
+        client.force_login(author)
+        url = reverse('notes:list')
+        assert client.get(url).status_code == 200
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                client.get(url)
+        elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'queries': len(queries) / requests,
+        'ms': elapsed / requests * 1000,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--child', action='store_true',
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.requests)
+        return
+    for profile in PROFILES:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.sessions', '--child',
+             '--requests', str(args.requests)],
+            check=True, capture_output=True, text=True,
+            env={**os.environ, 'YANOTE_SESSIONS': profile},
+        ).stdout
+        result = json.loads(output.splitlines()[-1])
+        print(f'{profile:<15} {result["queries"]:.1f} запросов, '
+              f'{result["ms"]:.2f} мс на запрос')
+
+
+if __name__ == '__main__':
+    main()
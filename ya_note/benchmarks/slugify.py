@@ -0,0 +1,60 @@
+"""Пропускная способность транслитерации кириллических заголовков.
+
+Запуск: python -m benchmarks.slugify [--titles 100000] [--unique 5000]
+
+Заголовки выбираются из набора уникальных с перекосом к популярным,
+как при массовом импорте. Сравниваются pytils slugify напрямую,
+slugify с кешем и пакетный slugify_many.
+"""
+import argparse
+import random
+import time
+
+from pytils.translit import slugify as pytils_slugify
+
+from notes.slugs import slugify, slugify_many
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def make_titles(count, unique, rng):
+    words = [
+        ''.join(rng.choices(ALPHABET, k=rng.randint(3, 10)))
+        for _ in range(unique * 3)
+    ]
+    pool = [
+        ' '.join(rng.sample(words, rng.randint(2, 6))).capitalize()
+        for _ in range(unique)
+    ]
+    # Перекос к популярным: вес заголовка обратно пропорционален рангу.
+    weights = [1 / rank for rank in range(1, unique + 1)]
+    return rng.choices(pool, weights=weights, k=count)
+
+
+def measure(label, func, titles):
+    started = time.perf_counter()
+    func(titles)
+    elapsed = time.perf_counter() - started
+    print(f'{label:<22} {len(titles) / elapsed:>12,.0f} заголовков/с')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--titles', type=int, default=100_000)
+    parser.add_argument('--unique', type=int, default=5_000)
+    args = parser.parse_args()
+    titles = make_titles(args.titles, args.unique, random.Random(0))
+    measure('pytils slugify', lambda items: [
+        pytils_slugify(title) for title in items
+    ], titles)
+    slugify.cache_clear()
+    measure('slugify с кешем', lambda items: [
+        slugify(title) for title in items
+    ], titles)
+    print(f'  {slugify.cache_info()}')
+    slugify.cache_clear()
+    measure('slugify_many', slugify_many, titles)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Параллельное создание заметок с одинаковыми заголовками.
+
+Запуск: python -m benchmarks.slugs [--threads 8] [--notes 50]
+
+Все потоки одновременно создают заметки с одним заголовком, поэтому
+slug постоянно конфликтуют. Замер проверяет, что ни одно создание не
+упало, все slug уникальны, и считает запросы SELECT на одну заметку.
+"""
+import argparse
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from benchmarks import test_database
+from notes.models import Note
+
+TITLE = 'Одинаковый заголовок'
+
+
+def create_notes(author, count, results):
+    errors, selects = 0, 0
+    try:
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as queries:
+                try:
+                    Note.objects.create(title=TITLE, text=TITLE,
+                                        author=author)
+                except Exception:
+                    errors += 1
+            selects = max(selects, sum(
+                query['sql'].startswith('SELECT') for query in queries
+            ))
+    finally:
+        connection.close()
+    results.append((errors, selects))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--notes', type=int, default=50,
+                        help='заметок на поток')
+    args = parser.parse_args()
+    with test_database():
+        author = get_user_model().objects.create(username='author')
+        results = []
+        threads = [
+            threading.Thread(
+                target=create_notes, args=(author, args.notes, results)
+            )
+            for _ in range(args.threads)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        slugs = list(Note.objects.values_list('slug', flat=True))
+    print(f'создано заметок: {len(slugs)} за {elapsed:.2f} с '
+          f'({len(slugs) / elapsed:.0f} в секунду)')
+    print(f'ошибок создания: {sum(errors for errors, _ in results)}')
+    print(f'все slug уникальны: {len(set(slugs)) == len(slugs)}')
+    print('больше всего SELECT на одну заметку: '
+          f'{max(selects for _, selects in results)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,21 @@
 from django.apps import AppConfig
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from yanote.auth import forget_user
+        from yanote.db import tune_sqlite
+        from yanote.metrics import install_query_counter
+
+        connection_created.connect(tune_sqlite, dispatch_uid='tune_sqlite')
+        connection_created.connect(install_query_counter,
+                                   dispatch_uid='install_query_counter')
+        for signal in (post_save, post_delete):
+            signal.connect(forget_user, sender=get_user_model(),
+                           dispatch_uid='forget_user')
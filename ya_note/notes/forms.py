@@ -1,9 +1,8 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
 from .models import Note
+from .slugs import slugify
 
 WARNING = ' - такой slug уже существует, придумайте уникальное значение!'
 
@@ -27,3 +26,11 @@ class NoteForm(forms.ModelForm):
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """Не проверяет slug повторно: это уже сделано в clean_slug."""
+        exclude = self._get_validation_exclusions() | {'slug'}
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
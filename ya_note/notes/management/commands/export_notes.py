@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.models import Note
+from notes.transfer import FIELDS, FORMATS, detect_format, write_records
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает заметки автора в JSON Lines или CSV. Заметки читаются '
+        'из базы порциями, поэтому память не растёт с их количеством.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл или «-» для stdout')
+        parser.add_argument('--author', required=True,
+                            help='username автора заметок')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            author = get_user_model().objects.get(username=options['author'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Нет пользователя {options["author"]}.')
+        records = Note.objects.filter(
+            author=author
+        ).order_by('id').values(*FIELDS).iterator(
+            chunk_size=options['chunk_size']
+        )
+        fmt = detect_format(options['path'], options['format'])
+        if options['path'] == '-':
+            total = write_records(self.stdout, fmt, records)
+        else:
+            with open(options['path'], 'w', encoding='utf-8',
+                      newline='') as file:
+                total = write_records(file, fmt, records)
+        self.stderr.write(f'Выгружено заметок: {total}')
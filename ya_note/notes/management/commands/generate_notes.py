@@ -0,0 +1,88 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from notes.models import Note
+from notes.synthetic import TextGenerator, zipf_counts
+from notes.transfer import batched
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует синтетических пользователей и заметки с русским '
+        'текстом. Заметки распределяются по авторам по закону Ципфа; одно '
+        'и то же зерно даёт одни и те же данные. Строки пишутся пачками '
+        'bulk_create в одной транзакции, внешние ключи проверяются один '
+        'раз в конце.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1_000)
+        parser.add_argument('--notes', type=int, default=100_000,
+                            help='всего заметок')
+        parser.add_argument('--exponent', type=float, default=1.1,
+                            help='показатель распределения Ципфа')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5_000)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        text = TextGenerator(rng)
+        started = time.perf_counter()
+        # На SQLite внешние ключи отключаются только вне транзакции.
+        with connection.constraint_checks_disabled(), transaction.atomic():
+            user_ids = self.create_users(options)
+            self.create_notes(options, rng, text, user_ids)
+            connection.check_constraints(
+                table_names=[Note._meta.db_table]
+            )
+        total = options['users'] + options['notes']
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано строк: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
+
+    def create_users(self, options):
+        User = get_user_model()
+        ids = []
+        for batch in batched((
+            User(
+                username=f'synthetic_{options["seed"]}_{index}',
+                # Без хеширования: войти под такими пользователями нельзя.
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+            for index in range(options['users'])
+        ), options['batch_size']):
+            ids += [user.pk for user in User.objects.bulk_create(batch)]
+        return ids
+
+    def create_notes(self, options, rng, text, user_ids):
+        counts = zipf_counts(
+            options['notes'], len(user_ids), options['exponent'], rng
+        )
+        title_length = Note._meta.get_field('title').max_length
+
+        def notes():
+            index = 0
+            for author_id, count in zip(user_ids, counts):
+                for _ in range(count):
+                    # slug задаётся сразу: подбор по заголовку здесь не
+                    # нужен, а номер гарантирует уникальность.
+                    yield Note(
+                        title=text.title(title_length), text=text.text(),
+                        slug=f'synthetic-{options["seed"]}-{index}',
+                        author_id=author_id,
+                    )
+                    index += 1
+
+        created = 0
+        for batch in batched(notes(), options['batch_size']):
+            Note.objects.bulk_create(batch)
+            created += len(batch)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'заметок: {created}')
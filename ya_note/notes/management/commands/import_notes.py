@@ -0,0 +1,77 @@
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+from notes.models import Note
+from notes.slugs import allocate_slugs, slugify_many
+from notes.transfer import FORMATS, batched, detect_format, read_records
+
+# Сколько раз повторять пачку, если её slug успели занять параллельно.
+BATCH_ATTEMPTS = 3
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки автора из JSON Lines или CSV пачками через '
+        'bulk_create. Недостающие и занятые slug подбираются на всю пачку '
+        'сразу.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='файл или «-» для stdin')
+        parser.add_argument('--author', required=True,
+                            help='username автора заметок')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            author = get_user_model().objects.get(username=options['author'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Нет пользователя {options["author"]}.')
+        fmt = detect_format(options['path'], options['format'])
+        started = time.perf_counter()
+        if options['path'] == '-':
+            total = self.load(sys.stdin, fmt, author, options['batch_size'])
+        else:
+            with open(options['path'], encoding='utf-8', newline='') as file:
+                total = self.load(file, fmt, author, options['batch_size'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено заметок: {total} за {elapsed:.1f} с'
+        ))
+
+    def load(self, stream, fmt, author, batch_size):
+        total = 0
+        for batch in batched(read_records(stream, fmt), batch_size):
+            self.save_batch(batch, author)
+            total += len(batch)
+        return total
+
+    def save_batch(self, batch, author):
+        max_length = Note._meta.get_field('slug').max_length
+        titles = [record['title'] for record in batch]
+        generated = iter(slugify_many(
+            [record['title'] for record in batch if not record.get('slug')]
+        ))
+        bases = [
+            (record.get('slug') or next(generated))[:max_length]
+            for record in batch
+        ]
+        for attempt in range(BATCH_ATTEMPTS):
+            slugs = allocate_slugs(Note.objects, bases, max_length)
+            notes = [
+                Note(title=title, text=record['text'], slug=slug,
+                     author=author)
+                for title, record, slug in zip(titles, batch, slugs)
+            ]
+            try:
+                with transaction.atomic():
+                    Note.objects.bulk_create(notes)
+                return
+            except IntegrityError:
+                if attempt == BATCH_ATTEMPTS - 1:
+                    raise
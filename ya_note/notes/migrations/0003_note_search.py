@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# Полнотекстовый индекс заметок (FTS5) с внешним содержимым: сам текст
+# хранится только в notes_note, индекс обновляют триггеры. Представление
+# добавляет колонку author с токеном вида «a<id автора>», чтобы поиск
+# пересекал индекс с заметками одного автора внутри FTS5.
+CREATE_SEARCH = (
+    """
+    CREATE VIEW notes_note_fts_source AS
+    SELECT id, title, text, 'a' || author_id AS author FROM notes_note
+    """,
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text, author,
+        content='notes_note_fts_source', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts (rowid, title, text, author)
+        VALUES (new.id, new.title, new.text, 'a' || new.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts (notes_note_fts, rowid, title, text, author)
+        VALUES ('delete', old.id, old.title, old.text, 'a' || old.author_id);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update
+    AFTER UPDATE OF title, text, author_id ON notes_note BEGIN
+        INSERT INTO notes_note_fts (notes_note_fts, rowid, title, text, author)
+        VALUES ('delete', old.id, old.title, old.text, 'a' || old.author_id);
+        INSERT INTO notes_note_fts (rowid, title, text, author)
+        VALUES (new.id, new.title, new.text, 'a' || new.author_id);
+    END
+    """,
+    "INSERT INTO notes_note_fts (notes_note_fts) VALUES ('rebuild')",
+)
+
+DROP_SEARCH = (
+    'DROP TRIGGER notes_note_fts_update',
+    'DROP TRIGGER notes_note_fts_delete',
+    'DROP TRIGGER notes_note_fts_insert',
+    'DROP TABLE notes_note_fts',
+    'DROP VIEW notes_note_fts_source',
+)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_author_id_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SEARCH, DROP_SEARCH),
+    ]
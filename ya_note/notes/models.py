@@ -1,7 +1,7 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import free_slug, slugify, taken_slugs
 
 
 class Note(models.Model):
@@ -28,11 +28,46 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        base = self.slug
+        if not base:
+            base = slugify(self.title)[:max_slug_length]
+            self.slug = free_slug(
+                base, taken_slugs(Note.objects, base, max_slug_length),
+                max_slug_length
+            )
+        if not self._state.adding:
+            return super().save(*args, **kwargs)
+        return self._insert_with_free_slug(base, max_slug_length,
+                                           *args, **kwargs)
+
+    def _insert_with_free_slug(self, base, max_slug_length, *args, **kwargs):
+        """Вставляет заметку, пока не найдётся незанятый номер slug.
+
+        Если slug заняли между проверкой и вставкой, занятые варианты
+        перечитываются один раз, дальше номер растёт без запросов.
+        Каждый проигрыш значит, что параллельная вставка прошла,
+        поэтому цикл конечен.
+        """
+        taken = None
+        while True:
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if taken is None:
+                    taken = taken_slugs(Note.objects, base, max_slug_length)
+                    if self.slug not in taken:
+                        # Ошибка не из-за slug: повтор её не исправит.
+                        raise
+            taken.add(self.slug)
+            self.slug = free_slug(base, taken, max_slug_length)
@@ -0,0 +1,80 @@
+"""Полнотекстовый поиск по заметкам автора.
+
+Индекс notes_note_fts (FTS5, миграция 0003_note_search) строится по
+заголовку и тексту и обновляется триггерами на notes_note, поэтому его
+не нужно поддерживать из Python, в том числе при bulk_create. Запрос
+к индексу сразу ограничен токеном автора, так что поиск не просматривает
+чужие заметки.
+
+Триггеры живут на таблице notes_note: если будущая миграция пересоберёт
+её (SQLite делает так при многих AlterField), триггеры нужно создать
+заново той же миграцией.
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+WORD = re.compile(r'\w+')
+# Маркеры подсветки из FTS5: текст экранируется уже после поиска,
+# и только потом маркеры заменяются на теги.
+MARK_START, MARK_END = '\x02', '\x03'
+SNIPPET_TOKENS = 16
+TITLE_WEIGHT, TEXT_WEIGHT = 10.0, 1.0
+
+SEARCH_SQL = f"""
+    SELECT note.id, note.slug,
+           highlight(notes_note_fts, 0, %s, %s),
+           snippet(notes_note_fts, 1, %s, %s, '…', {SNIPPET_TOKENS})
+    FROM notes_note_fts
+    JOIN notes_note AS note ON note.id = notes_note_fts.rowid
+    WHERE notes_note_fts MATCH %s
+    ORDER BY bm25(notes_note_fts, {TITLE_WEIGHT}, {TEXT_WEIGHT}, 0)
+    LIMIT %s
+"""
+
+
+def match_expression(author_id, query):
+    """Выражение MATCH: все слова запроса как префиксы, только у автора.
+
+    Слова берутся из запроса без операторов FTS5, поэтому пользователь
+    не может сломать выражение кавычками или скобками.
+    """
+    words = WORD.findall(query)
+    if not words:
+        return None
+    terms = ' '.join(f'"{word}"*' for word in words)
+    return f'author:a{author_id} AND {{title text}}: ({terms})'
+
+
+def highlighted(fragment):
+    return mark_safe(
+        escape(fragment).replace(MARK_START, '<mark>').replace(
+            MARK_END, '</mark>'
+        )
+    )
+
+
+def search_notes(author, query, limit):
+    """Заметки автора по запросу, лучшие первыми.
+
+    Возвращает словари с id, slug и подсвеченными title и snippet.
+    """
+    expression = match_expression(author.pk, query)
+    if expression is None:
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL, (
+            MARK_START, MARK_END, MARK_START, MARK_END, expression, limit
+        ))
+        rows = cursor.fetchall()
+    return [
+        {
+            'id': note_id,
+            'slug': slug,
+            'title': highlighted(title),
+            'snippet': highlighted(snippet),
+        }
+        for note_id, slug, title, snippet in rows
+    ]
@@ -0,0 +1,104 @@
+"""Транслитерация заголовков и выдача уникальных slug для заметок.
+
+Если slug занят, к нему добавляется наименьший свободный номер: slug-2,
+slug-3 и так далее. Все занятые варианты выбираются одним запросом по
+диапазону уникального индекса, а не перебором по одному.
+"""
+from collections import Counter
+from functools import lru_cache, reduce
+from operator import or_
+
+from django.db.models import Q
+from pytils.translit import slugify as pytils_slugify
+
+# Сколько последних заголовков помнит slugify.
+SLUGIFY_CACHE_SIZE = 4096
+
+# Сколько заготовок slug проверять одним запросом с диапазонами: SQLite
+# ограничивает глубину выражения в WHERE.
+RANGES_PER_QUERY = 300
+
+# Сколько символов оставлять под «-<номер>», если slug обрезается
+# до максимальной длины поля.
+SUFFIX_RESERVE = 10
+
+
+@lru_cache(maxsize=SLUGIFY_CACHE_SIZE)
+def slugify(title):
+    """Slugify из pytils, запоминающий результаты для повторных заголовков.
+
+    Число попаданий и промахов возвращает slugify.cache_info().
+    """
+    return pytils_slugify(title)
+
+
+def slugify_many(titles):
+    """Slug для пачки заголовков в том же порядке.
+
+    Каждый различный заголовок транслитерируется один раз.
+    """
+    slugs = {title: slugify(title) for title in dict.fromkeys(titles)}
+    return [slugs[title] for title in titles]
+
+
+def slug_range(base, max_length):
+    """Условие на slug, совпадающие с base или его вариантами.
+
+    Символы slug не меньше дефиса, поэтому base и все «base-<номер>»
+    лежат в одном диапазоне уникального индекса.
+    """
+    stem = base[:max_length - SUFFIX_RESERVE]
+    if stem == base:
+        # Короткий slug не обрезается, варианты имеют вид «base-<номер>».
+        return Q(slug__gte=base, slug__lt=base + '-\uffff')
+    return Q(slug__gte=stem, slug__lt=stem + '\uffff')
+
+
+def taken_slugs(queryset, base, max_length):
+    """Занятые slug, с которыми может совпасть base или его варианты."""
+    return set(queryset.filter(
+        slug_range(base, max_length)
+    ).values_list('slug', flat=True))
+
+
+def free_slug(base, taken, max_length):
+    """Первый из вариантов base, base-2, base-3..., которого нет в taken."""
+    if base not in taken:
+        return base
+    number = 2
+    while True:
+        suffix = f'-{number}'
+        candidate = base[:max_length - len(suffix)] + suffix
+        if candidate not in taken:
+            return candidate
+        number += 1
+
+
+def allocate_slugs(queryset, bases, max_length):
+    """Свободные slug для пачки заготовок, в том же порядке.
+
+    Первый запрос находит заготовки, уже занятые в базе. Варианты
+    выбираются только для них и для повторов внутри пачки, по
+    RANGES_PER_QUERY заготовок на запрос.
+    """
+    taken = set(queryset.filter(
+        slug__in=set(bases)
+    ).values_list('slug', flat=True))
+    counts = Counter(bases)
+    crowded = sorted(
+        base for base in counts if base in taken or counts[base] > 1
+    )
+    for start in range(0, len(crowded), RANGES_PER_QUERY):
+        ranges = (
+            slug_range(base, max_length)
+            for base in crowded[start:start + RANGES_PER_QUERY]
+        )
+        taken.update(queryset.filter(
+            reduce(or_, ranges)
+        ).values_list('slug', flat=True))
+    slugs = []
+    for base in bases:
+        slug = free_slug(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
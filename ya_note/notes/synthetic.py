@@ -0,0 +1,68 @@
+"""Синтетические данные для замеров: русский текст и закон Ципфа.
+
+Все случайные решения принимает переданный random.Random, поэтому при
+одном и том же зерне получаются одни и те же данные. Модуль одинаков в
+обоих проектах.
+"""
+from itertools import accumulate
+
+VOWELS = 'аеиоуыяею'
+CONSONANTS = 'бвгдзклмнпрстхчшж'
+
+
+def zipf_cum_weights(count, exponent):
+    """Накопленные веса рангов 1..count для random.choices."""
+    return list(accumulate(1 / rank ** exponent for rank in range(
+        1, count + 1
+    )))
+
+
+def zipf_counts(total, buckets, exponent, rng):
+    """Раскладывает total элементов по buckets корзинам по Ципфу.
+
+    Крупнейшие корзины достаются случайным номерам, а не первым, как
+    популярные новости в ленте. Сумма счётчиков ровно total.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, buckets + 1)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Остаток от округления вниз меньше buckets: по одному в верхние ранги.
+    for index in range(total - sum(counts)):
+        counts[index] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+class TextGenerator:
+    """Русскоподобный текст из словаря с частотами слов по Ципфу."""
+
+    def __init__(self, rng, vocabulary=20000, exponent=1.0):
+        self.rng = rng
+        self.words = [self.make_word() for _ in range(vocabulary)]
+        self.cum_weights = zipf_cum_weights(vocabulary, exponent)
+
+    def make_word(self):
+        syllables = self.rng.randint(1, 4)
+        word = ''.join(
+            self.rng.choice(CONSONANTS) + self.rng.choice(VOWELS)
+            for _ in range(syllables)
+        )
+        if self.rng.random() < 0.4:
+            word += self.rng.choice(CONSONANTS)
+        return word
+
+    def sentence(self, min_words=4, max_words=12):
+        words = self.rng.choices(
+            self.words, cum_weights=self.cum_weights,
+            k=self.rng.randint(min_words, max_words),
+        )
+        return ' '.join(words).capitalize() + '.'
+
+    def title(self, max_length):
+        return self.sentence(2, 7)[:-1][:max_length]
+
+    def text(self, min_sentences=1, max_sentences=6):
+        return ' '.join(
+            self.sentence()
+            for _ in range(self.rng.randint(min_sentences, max_sentences))
+        )
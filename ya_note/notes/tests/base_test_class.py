@@ -27,6 +27,7 @@ class BaseTestClass(TestCase):
     NOTES_HOME_URL = reverse('notes:home')
     NOTES_SUCCESS_URL = reverse('notes:success')
     NOTES_LIST_URL = reverse('notes:list')
+    NOTES_SEARCH_URL = reverse('notes:search')
     NOTES_ADD_URL = reverse(NOTES_ADD_NAME)
     NOTES_DETAIL_URL = reverse('notes:detail',
                                kwargs={'slug': TEST_SLUG})
@@ -34,6 +35,7 @@ class BaseTestClass(TestCase):
                              kwargs={'slug': TEST_SLUG})
     NOTES_DELETE_URL = reverse('notes:delete',
                                kwargs={'slug': TEST_SLUG})
+    REQUEST_STATS_URL = reverse('request_stats')
 
     # Шаблон редиректа
     REDIRECT_TEMPLATE = string.Template(
@@ -1,14 +1,26 @@
 """Тесты контента."""
+import re
+from http import HTTPStatus
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
 from django.urls import reverse
 
 from notes.models import Note
 from notes.forms import NoteForm
 from notes.tests.base_test_class import BaseTestClass
+from yanote.metrics import stats
 
 
 User = get_user_model()
 
+# Полный просмотр таблицы в выводе EXPLAIN QUERY PLAN выглядит
+# как «SCAN <таблица>» без упоминания индекса.
+FULL_SCAN = re.compile(r'^SCAN \S+$')
+
 
 class TestPages(BaseTestClass):
     """Проверка страниц."""
@@ -45,6 +57,35 @@ class TestPages(BaseTestClass):
         # Проверяем что запись пренадлежит юзеру
         self.assertEqual(object_list[0].author, self.author)
 
+    def test_notes_pages_by_cursor(self):
+        """Проверка постраничного списка с фильтром по началу заголовка."""
+        page_notes = Note.objects.bulk_create(
+            Note(title=f'Страница {index}', text=self.NOTE_TEXT,
+                 slug=f'page-{index}', author=self.author)
+            for index in range(5)
+        )
+        self.client.force_login(self.author)
+        shown = []
+        params = {'prefix': 'Страница'}
+        with self.settings(NOTES_PAGE_SIZE=2):
+            while params:
+                # Сессия, пользователь и одна выборка страницы.
+                with self.assertNumQueries(3):
+                    response = self.client.get(self.NOTES_LIST_URL, params)
+                shown += [note.id for note in response.context['object_list']]
+                cursor = response.context.get('next_cursor')
+                params = cursor and {'prefix': 'Страница', 'after': cursor}
+        self.assertEqual(shown, [note.id for note in page_notes])
+
+    def test_bad_cursor_is_not_found(self):
+        """Испорченный курсор списка заметок даёт 404, а не 500."""
+        self.client.force_login(self.author)
+        for cursor in ('abc', '²', '-1', '99999999999999999999'):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.NOTES_LIST_URL,
+                                           {'after': cursor})
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
     def test_authorized_client_has_form(self):
         """Проверка наличия формы на страницах создания и редактирования.
         Для проверки используем author и его заметку
@@ -61,3 +102,121 @@ class TestPages(BaseTestClass):
                 self.assertIn('form', response.context)
                 # Проверим, что объект формы соответствует классу
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+    def test_list_query_uses_index(self):
+        """Проверка, что список заметок выбирается по индексу."""
+        self.client.force_login(self.author)
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.NOTES_LIST_URL)
+        main_queries = [query['sql'] for query in queries
+                        if 'FROM "notes_note"' in query['sql']]
+        self.assertTrue(main_queries)
+        for sql in main_queries:
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            for step in plan:
+                with self.subTest(sql=sql, step=step):
+                    self.assertNotRegex(step, FULL_SCAN)
+                    self.assertNotIn('TEMP B-TREE', step)
+
+    def test_request_stats_report(self):
+        """Проверка сводки замеров запросов по именам адресов."""
+        stats.clear()
+        self.client.force_login(self.author)
+        self.client.get(self.NOTES_LIST_URL)
+        staff = User.objects.create(username='staff', is_staff=True)
+        self.client.force_login(staff)
+        report = self.client.get(self.REQUEST_STATS_URL).json()
+        self.assertEqual(report['notes:list']['count'], 1)
+        # Сессия, пользователь и сам список.
+        self.assertEqual(report['notes:list']['queries']['p99'], 3)
+
+
+class TestSessionProfile(BaseTestClass):
+    """Проверка профиля сессий с загрузкой пользователя через кеш."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_list_skips_session_and_user_queries(self):
+        """Список заметок обходится без запросов сессии и пользователя."""
+        with override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies',
+            AUTHENTICATION_BACKENDS=['yanote.auth.CachedModelBackend'],
+        ):
+            # Движок сессий выбирается при загрузке middleware,
+            # поэтому профилю нужен свой клиент.
+            client = Client()
+            client.force_login(self.author)
+            client.get(self.NOTES_LIST_URL)
+            with self.assertNumQueries(1):
+                response = client.get(self.NOTES_LIST_URL)
+            self.assertEqual(response.context['user'], self.author)
+
+    def test_user_change_resets_cache(self):
+        """Изменение пользователя сразу видно в следующем запросе."""
+        with override_settings(
+            AUTHENTICATION_BACKENDS=['yanote.auth.CachedModelBackend']
+        ):
+            self.client.force_login(self.author)
+            self.client.get(self.NOTES_LIST_URL)
+            self.author.is_active = False
+            self.author.save()
+            response = self.client.get(self.NOTES_LIST_URL)
+        self.assertRedirects(
+            response,
+            self.REDIRECT_TEMPLATE.substitute(url=self.NOTES_LIST_URL)
+        )
+
+
+class TestSearch(BaseTestClass):
+    """Проверка полнотекстового поиска по заметкам."""
+
+    def search(self, query):
+        response = self.client.get(self.NOTES_SEARCH_URL, {'q': query})
+        return response.context['results']
+
+    def test_search_ranks_and_highlights_own_notes(self):
+        """Поиск находит заметки автора, совпадения в заголовке выше."""
+        in_text = Note.objects.create(
+            title='Покупки', text='Купить молоко и хлеб', author=self.author
+        )
+        in_title = Note.objects.create(
+            title='Молоко', text='Обезжиренное', author=self.author
+        )
+        Note.objects.create(title='Молоко', text='Чужая заметка',
+                            author=self.reader)
+        self.client.force_login(self.author)
+        # Сессия, пользователь и один запрос к индексу.
+        with self.assertNumQueries(3):
+            results = self.search('молок')
+        self.assertEqual([note['id'] for note in results],
+                         [in_title.id, in_text.id])
+        self.assertEqual(results[0]['title'], '<mark>Молоко</mark>')
+        self.assertIn('<mark>молоко</mark>', results[1]['snippet'])
+
+    def test_index_follows_changes(self):
+        """Индекс обновляется при изменении и удалении заметки."""
+        note = Note.objects.create(title=self.NOTE_TITLE, text=self.NOTE_TEXT,
+                                   slug=self.TEST_SLUG, author=self.author)
+        self.client.force_login(self.author)
+        self.assertEqual(self.search(self.NOTE_TITLE)[0]['slug'],
+                         self.TEST_SLUG)
+        note.title = 'Переименованная'
+        note.save()
+        self.assertEqual(self.search(self.NOTE_TITLE), [])
+        self.assertEqual(len(self.search('переименованная')), 1)
+        note.delete()
+        self.assertEqual(self.search('переименованная'), [])
+
+    def test_search_escapes_html_and_operators(self):
+        """Текст заметки экранируется, операторы FTS5 не действуют."""
+        Note.objects.create(title='Разметка', text='<script>alert</script>',
+                            author=self.author)
+        self.client.force_login(self.author)
+        snippet = self.search('script')[0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;<mark>script</mark>&gt;', snippet)
+        self.assertEqual(self.search('" OR ( *'), [])
@@ -1,14 +1,30 @@
 """Проверка логики."""
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
 from http import HTTPStatus
+from io import StringIO
+from unittest import mock
 
 from pytils.translit import slugify
 
 from django.contrib.auth import get_user_model
-from django.test import Client
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import Count
+from django.test import Client, TestCase, override_settings
 
 from notes.forms import WARNING
 from notes.models import Note
+from notes.slugs import slugify as cached_slugify, slugify_many
+from notes.synthetic import zipf_counts
 from notes.tests.base_test_class import BaseTestClass
+import yanote.settings
+import yanote.settings_test
 
 User = get_user_model()
 
@@ -171,3 +187,200 @@ class TestNoteEditDelete(BaseTestClass):
         self.note.refresh_from_db()
         # Проверяем, что текст остался тем же, что и был.
         self.assertEqual(self.note.text, self.NOTE_TEXT)
+
+
+class TestSlugAllocation(BaseTestClass):
+    """Проверка выдачи свободных slug."""
+
+    def create_note(self, **fields):
+        return Note.objects.create(text=self.NOTE_TEXT, author=self.author,
+                                   **fields)
+
+    def test_same_titles_get_numbered_slugs(self):
+        """Одинаковые заголовки получают наименьший свободный номер."""
+        slugs = [self.create_note(title=self.NOTE_TITLE).slug
+                 for _ in range(3)]
+        base = slugify(self.NOTE_TITLE)
+        self.assertEqual(slugs, [base, f'{base}-2', f'{base}-3'])
+        Note.objects.filter(slug=f'{base}-2').delete()
+        self.assertEqual(self.create_note(title=self.NOTE_TITLE).slug,
+                         f'{base}-2')
+
+    def test_long_slug_is_cut_for_number(self):
+        """Номер помещается в slug максимальной длины."""
+        title = 'а' * 150
+        first = self.create_note(title=title)
+        second = self.create_note(title=title)
+        self.assertEqual(len(first.slug), 100)
+        self.assertEqual(len(second.slug), 100)
+        self.assertEqual(second.slug, first.slug[:98] + '-2')
+
+    def test_taken_slug_does_not_fail_create(self):
+        """Занятый к моменту вставки slug не приводит к ошибке."""
+        self.create_note(title=self.NOTE_TITLE, slug=self.TEST_SLUG)
+        # Так выглядит гонка: проверка формы прошла, но slug уже занят.
+        note = self.create_note(title=self.NOTE_TITLE, slug=self.TEST_SLUG)
+        self.assertEqual(note.slug, f'{self.TEST_SLUG}-2')
+
+    def test_slugify_is_memoized(self):
+        """Повторный заголовок берётся из кеша транслитерации."""
+        titles = [self.NOTE_TITLE, self.NOTE_TEXT, self.NOTE_TITLE]
+        cached_slugify.cache_clear()
+        self.assertEqual(slugify_many(titles),
+                         [slugify(title) for title in titles])
+        cached_slugify(self.NOTE_TEXT)
+        info = cached_slugify.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 2))
+
+    def test_slug_costs_one_query(self):
+        """На подбор slug уходит один запрос."""
+        # Подбор slug, затем INSERT в SAVEPOINT.
+        with self.assertNumQueries(4):
+            self.create_note(title=self.NOTE_TITLE)
+
+
+class TestWriteQueries(BaseTestClass):
+    """Проверка числа запросов к базе у изменяющих представлений."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.note = Note.objects.create(title=cls.NOTE_TITLE,
+                                       text=cls.NOTE_TEXT,
+                                       slug=cls.TEST_SLUG,
+                                       author=cls.author)
+
+    def setUp(self):
+        self.client.force_login(self.author)
+
+    def test_write_views_query_count(self):
+        """Каждое изменение укладывается в известное число запросов."""
+        cases = (
+            # Сессия, пользователь, проверка slug, INSERT в SAVEPOINT.
+            (self.NOTES_ADD_URL,
+             {'title': self.NOTE_TITLE + '_new', 'text': self.NOTE_TEXT}, 6),
+            # Сессия, пользователь, заметка, проверка slug, UPDATE.
+            (self.NOTES_EDIT_URL,
+             {'title': self.NOTE_TITLE, 'text': self.NEW_NOTE_TEXT,
+              'slug': self.TEST_SLUG}, 5),
+            # Сессия, пользователь, заметка, DELETE.
+            (self.NOTES_DELETE_URL, {}, 4),
+        )
+        for url, data, expected_queries in cases:
+            with self.subTest(url=url):
+                with self.assertNumQueries(expected_queries):
+                    response = self.client.post(url, data=data)
+                self.assertRedirects(response, self.NOTES_SUCCESS_URL)
+
+
+class TestNotesTransfer(BaseTestClass):
+    """Проверка загрузки и выгрузки заметок командами."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def test_import_resolves_slugs_in_batch(self):
+        """Загрузка подбирает свободные slug внутри пачки и в базе."""
+        Note.objects.create(title=self.NOTE_TITLE, text=self.NOTE_TEXT,
+                            author=self.author)
+        records = [
+            {'title': self.NOTE_TITLE, 'text': self.NOTE_TEXT},
+            {'title': self.NOTE_TITLE, 'text': self.NOTE_TEXT},
+            {'title': self.NOTE_TITLE, 'text': self.NOTE_TEXT,
+             'slug': self.TEST_SLUG},
+        ]
+        with open(self.path('notes.jsonl'), 'w', encoding='utf-8') as file:
+            file.writelines(json.dumps(record) + '\n' for record in records)
+        call_command('import_notes', self.path('notes.jsonl'),
+                     author=self.AUTHOR_NAME, batch_size=2, stdout=StringIO())
+        base = slugify(self.NOTE_TITLE)
+        self.assertEqual(
+            list(Note.objects.order_by('id').values_list('slug', flat=True)),
+            [base, f'{base}-2', f'{base}-3', self.TEST_SLUG]
+        )
+
+    def test_export_import_round_trip(self):
+        """Выгруженные в CSV заметки загружаются другому автору."""
+        for index in range(3):
+            Note.objects.create(title=f'{self.NOTE_TITLE} {index}',
+                                text=self.NOTE_TEXT, author=self.author)
+        call_command('export_notes', self.path('notes.csv'),
+                     author=self.AUTHOR_NAME, chunk_size=2, stderr=StringIO())
+        call_command('import_notes', self.path('notes.csv'),
+                     author=self.READER_NAME, stdout=StringIO())
+        exported = list(Note.objects.filter(author=self.author).order_by(
+            'id').values_list('title', 'text'))
+        imported = list(Note.objects.filter(author=self.reader).order_by(
+            'id').values_list('title', 'text'))
+        self.assertEqual(imported, exported)
+
+
+class TestSqliteTuning(TestCase):
+    """Проверка настройки новых соединений SQLite."""
+
+    @override_settings(
+        SQLITE_PRAGMAS={'synchronous': 'normal', 'cache_size': -1024}
+    )
+    def test_pragmas_applied_to_new_connections(self):
+        """PRAGMA из SQLITE_PRAGMAS выполняются при подключении."""
+        connection = connections.create_connection('default')
+        self.addCleanup(connection.close)
+        with connection.cursor() as cursor:
+            for pragma, expected in (('synchronous', 1),
+                                     ('cache_size', -1024)):
+                with self.subTest(pragma=pragma):
+                    cursor.execute(f'PRAGMA {pragma}')
+                    self.assertEqual(cursor.fetchone(), (expected,))
+
+
+class TestFastAuthProfile(BaseTestClass):
+    """Проверка тестового профиля настроек yanote.settings_test."""
+
+    def test_signup_uses_cheap_hasher(self):
+        """Пароль при регистрации хешируется дешёвым MD5."""
+        password = 'Ne-prostoy-parol-42'
+        username = 'new_user'
+        response = self.client.post(self.NOTES_SIGNUP_URL, data={
+            'username': username,
+            'password1': password,
+            'password2': password,
+        })
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        user = get_user_model().objects.get(username=username)
+        self.assertTrue(user.password.startswith('md5$'))
+        self.assertTrue(user.check_password(password))
+
+    def test_refuses_outside_tests(self):
+        """Настройки не грузятся вне тестового раннера и замеров."""
+        # Загрузка модуля меняет имя базы в общем словаре тестовой базы.
+        with mock.patch.dict(sys.modules), \
+                mock.patch.dict(yanote.settings.DATABASES['default']):
+            for module in ('pytest', 'benchmarks'):
+                sys.modules.pop(module, None)
+            with mock.patch.object(sys, 'argv', ['manage.py', 'runserver']):
+                with self.assertRaises(ImproperlyConfigured):
+                    importlib.reload(yanote.settings_test)
+            with mock.patch.object(sys, 'argv', ['manage.py', 'test']):
+                importlib.reload(yanote.settings_test)
+
+
+class TestGenerateNotes(TestCase):
+    """Проверка генерации синтетических заметок."""
+
+    def test_generate_notes_command(self):
+        """Заметки распределяются по авторам с перекосом и без потерь."""
+        call_command('generate_notes', users=5, notes=200, seed=1,
+                     stdout=StringIO())
+        self.assertEqual(get_user_model().objects.count(), 5)
+        self.assertEqual(Note.objects.count(), 200)
+        expected = sorted(zipf_counts(200, 5, 1.1, random.Random(1)))
+        actual = sorted(
+            Note.objects.values('author').annotate(
+                total=Count('id')
+            ).values_list('total', flat=True)
+        )
+        self.assertEqual(actual, expected)
@@ -38,6 +38,7 @@ class TestRoutes(BaseTestClass):
     def test_availability_for_auth_user(self):
         """Проверка доступа авторизованного пользователю list, succes, add."""
         urls = (self.NOTES_LIST_URL,
+                self.NOTES_SEARCH_URL,
                 self.NOTES_SUCCESS_URL,
                 self.NOTES_ADD_URL,)
         self.client.force_login(self.author)
@@ -67,6 +68,7 @@ class TestRoutes(BaseTestClass):
     def test_redirect_for_anonymous_client(self):
         """Проверка редиректа анонима при просмотре защищенных страниц."""
         urls = (self.NOTES_LIST_URL,
+                self.NOTES_SEARCH_URL,
                 self.NOTES_SUCCESS_URL,
                 self.NOTES_ADD_URL,
                 self.NOTES_DETAIL_URL,
@@ -78,3 +80,20 @@ class TestRoutes(BaseTestClass):
                                      self.REDIRECT_TEMPLATE.substitute(
                                          {'url': url})
                                      )
+
+    def test_request_stats_only_for_staff(self):
+        """Проверка, что сводка замеров доступна только персоналу."""
+        staff = User.objects.create(username='staff', is_staff=True)
+        users_statuses = (
+            (None, HTTPStatus.FOUND),
+            (self.author, HTTPStatus.FOUND),
+            (staff, HTTPStatus.OK),
+        )
+        for user, status in users_statuses:
+            if user is not None:
+                self.client.force_login(user)
+            with self.subTest(user=user):
+                self.assertEqual(
+                    self.client.get(self.REQUEST_STATS_URL).status_code,
+                    status
+                )
@@ -0,0 +1,51 @@
+"""Чтение и запись заметок в JSON Lines и CSV для выгрузки и загрузки.
+
+Записи читаются и пишутся по одной, поэтому память не зависит от
+размера файла.
+"""
+import csv
+import json
+from itertools import islice
+
+FIELDS = ('title', 'text', 'slug')
+FORMATS = ('jsonl', 'csv')
+
+
+def detect_format(path, fmt=None):
+    """Формат из параметра или из расширения файла; по умолчанию jsonl."""
+    if fmt:
+        return fmt
+    return 'csv' if str(path).lower().endswith('.csv') else 'jsonl'
+
+
+def read_records(stream, fmt):
+    """Словари с полями заметки, по одному на строку файла."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def write_records(stream, fmt, records):
+    """Записывает словари с полями FIELDS, возвращает их количество."""
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in records:
+            writer.writerow(record)
+            count += 1
+        return count
+    for record in records:
+        stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+
+def batched(records, size):
+    """Разбивает поток записей на списки не длиннее size."""
+    records = iter(records)
+    while batch := list(islice(records, size)):
+        yield batch
@@ -1,11 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth import logout
+from django.http import Http404
 from django.shortcuts import render
 from django.urls import reverse_lazy
 from django.views import generic
 
 from .forms import NoteForm
 from .models import Note
+from .search import search_notes
+
+# Наибольший id, который SQLite принимает как INTEGER.
+MAX_ID = 2 ** 63 - 1
 
 
 def user_logout(request):
@@ -39,9 +45,9 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        # Автора проставляем до сохранения, чтобы запись ушла в базу
+        # одним INSERT, без повторного сохранения в ModelFormMixin.
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
@@ -56,11 +62,62 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+def parse_cursor(after):
+    """Разбирает курсор списка заметок; 404 на всё, что не id."""
+    try:
+        pk = int(after)
+    except ValueError:
+        raise Http404('Некорректный курсор.')
+    if not 0 <= pk <= MAX_ID:
+        raise Http404('Некорректный курсор.')
+    return pk
+
+
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """Список заметок пользователя постранично.
+
+    Страница начинается после id из параметра after, поэтому каждая
+    страница выбирается одним запросом по индексу (author, id) без OFFSET.
+    Параметр prefix оставляет заметки, чей заголовок начинается с него.
+    """
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        notes = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        prefix = self.request.GET.get('prefix')
+        if prefix:
+            notes = notes.filter(title__startswith=prefix)
+        after = self.request.GET.get('after')
+        if after:
+            notes = notes.filter(id__gt=parse_cursor(after))
+        return notes[:settings.NOTES_PAGE_SIZE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        notes = context['object_list']
+        context['prefix'] = self.request.GET.get('prefix', '')
+        # Полная страница — признак того, что за ней могут быть ещё заметки.
+        if len(notes) == settings.NOTES_PAGE_SIZE:
+            context['next_cursor'] = notes[len(notes) - 1].id
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        context['results'] = search_notes(
+            self.request.user, context['query'],
+            settings.NOTES_SEARCH_LIMIT
+        )
+        return context
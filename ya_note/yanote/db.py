@@ -0,0 +1,19 @@
+"""Настройка соединений SQLite.
+
+Функция tune_sqlite подключается к сигналу connection_created и на каждом
+новом соединении выполняет PRAGMA из настройки SQLITE_PRAGMAS. Пустой
+словарь (по умолчанию) оставляет соединения как есть.
+"""
+from django.conf import settings
+
+
+def tune_sqlite(sender, connection, **kwargs):
+    """Выполняет SQLITE_PRAGMAS на только что открытом соединении."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
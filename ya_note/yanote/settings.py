@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -22,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'yanote.metrics.RequestBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,13 +54,44 @@ TEMPLATES = [
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
+DATABASE_PROFILES = {
+    'default': {},
+    'tuned': {
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Секунды ожидания блокировки вместо «database is locked».
+            'timeout': 5,
+            # Пишущие транзакции сразу берут блокировку записи и ждут её,
+            # а не падают при попытке повысить блокировку чтения.
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+# YANOTE_DB=tuned включает профиль для конкурентной нагрузки: постоянные
+# соединения и PRAGMA из SQLITE_PRAGMAS (см. yanote/db.py).
+DATABASE_PROFILE = os.getenv('YANOTE_DB', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **DATABASE_PROFILES[DATABASE_PROFILE],
     }
 }
 
+SQLITE_PRAGMAS = {
+    # Читатели не блокируют писателя и наоборот.
+    'journal_mode': 'wal',
+    # В режиме WAL fsync нужен только при контрольной точке.
+    'synchronous': 'normal',
+    'mmap_size': 256 * 2 ** 20,
+    # Отрицательное значение — размер кеша страниц в КиБ.
+    'cache_size': -64 * 2 ** 10,
+    'busy_timeout': 5000,
+} if DATABASE_PROFILE == 'tuned' else {}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -85,5 +118,46 @@ STATIC_URL = '/static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    # Профиля cached_db нет: кеш проекта в памяти процесса, а выход удаляет
+    # сессию из кеша только своего процесса, так что другие процессы
+    # сервера пускали бы по ней до SESSION_COOKIE_AGE.
+    # Данные сессии хранятся в подписанной cookie у клиента, поэтому
+    # выход на одном устройстве не завершает скопированную сессию.
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+# YANOTE_SESSIONS=signed_cookies убирает запрос к таблице
+# сессий и подключает загрузку пользователя через кеш (yanote/auth.py).
+SESSION_PROFILE = os.getenv('YANOTE_SESSIONS', 'db')
+
+SESSION_ENGINE = SESSION_ENGINES[SESSION_PROFILE]
+
+AUTHENTICATION_BACKENDS = [
+    'django.contrib.auth.backends.ModelBackend'
+    if SESSION_PROFILE == 'db' else 'yanote.auth.CachedModelBackend'
+]
+
+# forget_user сбрасывает копию пользователя только в кеше своего процесса,
+# а кеш проекта — в памяти процесса: другие процессы сервера держат старую
+# копию до истечения срока (см. yanote/auth.py), поэтому он короткий.
+# Более долгий срок безопасен только с общим кешем в CACHES.
+USER_CACHE_TIMEOUT = 10
+
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_PAGE_SIZE = 50
+
+NOTES_SEARCH_LIMIT = 20
+
+# Бюджеты запросов по именам адресов, см. yanote/metrics.py.
+# Метрики: queries, sql_ms, template_ms, wall_ms.
+REQUEST_STATS_WINDOW = 1000
+REQUEST_BUDGET_DEFAULT = {'queries': 10, 'sql_ms': 100, 'wall_ms': 500}
+REQUEST_BUDGETS = {
+    'notes:list': {'queries': 3, 'wall_ms': 200},
+    'notes:detail': {'queries': 3, 'wall_ms': 200},
+    'notes:search': {'queries': 3, 'wall_ms': 200},
+}
@@ -0,0 +1,41 @@
+"""Настройки для тестов и нагрузочных замеров.
+
+Подключаются из pytest.ini, run_tests.sh и пакета benchmarks. Пароли
+хешируются дешёвым MD5 вместо PBKDF2, база по умолчанию в памяти, кеш
+в памяти процесса.
+
+Такие пароли небезопасны, поэтому модуль загружается только в тестовом
+раннере (pytest или manage.py test) и в замерах из пакета benchmarks,
+какими бы ни были DEBUG и переменные окружения: сервер его не загрузит.
+"""
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401, F403
+from .settings import DATABASES
+
+
+def running_tests():
+    return (
+        'pytest' in sys.modules
+        or 'benchmarks' in sys.modules
+        or sys.argv[1:2] == ['test']
+    )
+
+
+if not running_tests():
+    raise ImproperlyConfigured(
+        'yanote.settings_test загружается только в тестах и замерах.'
+    )
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+DATABASES['default']['NAME'] = ':memory:'
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yanote',
+    },
+}
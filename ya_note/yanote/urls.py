@@ -5,10 +5,12 @@ from django.urls import include, path
 from django.views.generic import CreateView
 
 from notes.views import user_logout
+from yanote.metrics import request_stats
 
 urlpatterns = [
     path('', include('notes.urls')),
     path('admin/', admin.site.urls),
+    path('metrics/', request_stats, name='request_stats'),
 ]
 
 auth_urls = ([